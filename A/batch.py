@@ -0,0 +1,97 @@
+#########################
+#####    Imports    #####
+#########################
+import os               # Parcours des dossiers, nombre de cœurs
+import glob             # Motifs de fichiers
+import time             # Mesure du temps de résolution
+import json             # Résultats au format JSON Lines
+import argparse         # Options de la ligne de commande
+from concurrent.futures import ProcessPoolExecutor, as_completed   # Résolution en parallèle
+
+from labyrinth import SOLVERS, BINARY_EXTENSION, grid_load, grid_find
+
+#########################
+### Résolution en lot ###
+#########################
+
+# Liste des fichiers de labyrinthe désignés par des chemins, dossiers ou motifs
+# - patterns: fichiers, dossiers (tous les .csv et .maze qu'ils contiennent) ou motifs glob
+# Renvoie la liste triée des fichiers, sans doublon
+def maze_files(patterns):
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for extension in ('.csv', BINARY_EXTENSION):
+                files.update(glob.glob(os.path.join(pattern, '*' + extension)))
+        else:
+            files.update(glob.glob(pattern))
+    return sorted(files)
+
+# Résolution d'un fichier, exécutée dans un processus du pool
+# - path: fichier du labyrinthe
+# - solver: nom de l'algorithme de résolution (voir SOLVERS)
+# Renvoie un dictionnaire de résultats (longueur du chemin, cases développées, temps)
+def maze_solve_file(path, solver):
+    t0 = time.perf_counter()
+    grid = grid_load(path)
+    start, goal = grid_find(grid, 3), grid_find(grid, 2)
+    if start is None:
+        start = (1,1)
+    if goal is None:
+        return {'path': path, 'solver': solver, 'error': "pas de case d'arrivée"}
+
+    t1 = time.perf_counter()
+    solution, expanded = SOLVERS[solver](grid, start, goal)
+    t2 = time.perf_counter()
+    return {
+        'path': path,
+        'solver': solver,
+        'length': len(solution)-1 if solution is not None else None,
+        'expanded': expanded,
+        'load_time': t1 - t0,
+        'time': t2 - t1,
+    }
+
+# Résolution d'un lot de fichiers sur plusieurs processus
+# Chaque résultat est écrit dans le fichier de sortie dès que son labyrinthe est résolu.
+# - files: fichiers de labyrinthe
+# - output: fichier JSON Lines de sortie (une ligne par labyrinthe)
+# - solver: nom de l'algorithme de résolution (voir SOLVERS)
+# - workers: nombre de processus (par défaut, un par cœur)
+# Renvoie le nombre de labyrinthes en erreur
+def batch_solve(files, output, solver='astar', workers=None):
+    errors = 0
+    with open(output, 'w') as out, ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(maze_solve_file, path, solver): path for path in files}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'path': futures[future], 'solver': solver, 'error': repr(e)}
+            if 'error' in result:
+                errors += 1
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    return errors
+
+# Main
+def main():
+    parser = argparse.ArgumentParser(description="Résolution d'un lot de labyrinthes en parallèle.")
+    parser.add_argument('patterns', nargs='+',
+                        help="fichiers, dossiers ou motifs (ex. 'mazes/*.maze') des labyrinthes à résoudre")
+    parser.add_argument('-o', '--output', default='results.jsonl',
+                        help="fichier JSON Lines des résultats")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='astar',
+                        help="algorithme de résolution")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="nombre de processus")
+    args = parser.parse_args()
+
+    files = maze_files(args.patterns)
+    t0 = time.perf_counter()
+    errors = batch_solve(files, args.output, args.solver, args.workers)
+    print('{0} labyrinthes résolus en {1:.2f} s ({2} en erreur) -> {3}'.format(
+        len(files) - errors, time.perf_counter() - t0, errors, args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#########################
+#####    Imports    #####
+#########################
+import sys              # Version de Python dans les résultats JSON
+import time             # Mesure du temps de résolution
+import json             # Export des résultats pour le suivi des régressions
+import argparse         # Options de la ligne de commande
+import platform         # Description de la machine dans les résultats JSON
+import tracemalloc      # Mesure du pic de mémoire
+import numpy as np      # Génération de grilles ouvertes
+
+from labyrinth import SOLVERS, grid_load, grid_find, maze_generate
+
+#########################
+#####   Benchmark   #####
+#########################
+
+# Grille ouverte : murs placés au hasard, sans couloirs
+# C'est le cas favorable à Jump Point Search, où A* ajoute chaque case à l'ensemble ouvert
+# - rows, cols: dimensions de la grille (bordure de murs comprise)
+# - density: proportion de murs à l'intérieur de la grille
+# - seed: graine du générateur aléatoire
+# Renvoie une grille avec le départ (3) en haut à gauche et l'arrivée (2) en bas à droite
+def open_grid(rows, cols, density, seed=0):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((rows, cols)) < density).astype(np.uint8)
+    grid[0,:] = grid[-1,:] = grid[:,0] = grid[:,-1] = 1
+    grid[1,1] = 3
+    grid[rows-2,cols-2] = 2
+    return grid
+
+# Types de grilles générées : labyrinthe (éventuellement percé de boucles) ou grille ouverte
+GENERATORS = {
+    'maze': lambda size, density, seed: maze_generate(size, size, seed, density),
+    'open': lambda size, density, seed: open_grid(size, size, density, seed),
+}
+
+# Résolution d'une grille par chacun des algorithmes, sans affichage
+# - grid: grille du labyrinthe
+# - solvers: noms des algorithmes à comparer (voir SOLVERS)
+# - memory: mesurer aussi le pic de mémoire (la résolution est alors lancée une seconde fois,
+#   car le suivi des allocations ralentit l'exécution et fausserait le temps mesuré)
+# Renvoie une liste de résultats (algorithme, longueur du chemin, cases développées, temps, mémoire)
+def benchmark(grid, solvers, memory=True):
+    start, goal = grid_find(grid, 3), grid_find(grid, 2)
+    results = []
+    for name in solvers:
+        t0 = time.perf_counter()
+        path, expanded = SOLVERS[name](grid, start, goal)
+        elapsed = time.perf_counter() - t0
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            SOLVERS[name](grid, start, goal)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        results.append({
+            'solver': name,
+            'length': len(path)-1 if path is not None else None,
+            'expanded': expanded,
+            'time': elapsed,
+            'peak_memory': peak,
+        })
+    return results
+
+# Affiche les résultats d'une grille sous forme de tableau
+def results_show(title, results):
+    print(title)
+    print('  {0:<8} {1:>10} {2:>12} {3:>10} {4:>12}'.format(
+        'solveur', 'longueur', 'développées', 'temps (s)', 'mémoire (Mo)'))
+    for r in results:
+        memory = '-' if r['peak_memory'] is None else '{0:.1f}'.format(r['peak_memory'] / 2**20)
+        print('  {0:<8} {1:>10} {2:>12} {3:>10.4f} {4:>12}'.format(
+            r['solver'], str(r['length']), r['expanded'], r['time'], memory))
+
+# Main
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison des algorithmes de résolution de labyrinthe.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 500, 1000],
+                        help="côtés des grilles générées (de 100 à 5000)")
+    parser.add_argument('--densities', nargs='+', type=float, default=[0.5, 0.3],
+                        help="proportions maximales de murs des grilles générées")
+    parser.add_argument('--kind', choices=sorted(GENERATORS), default='maze',
+                        help="type de grille générée")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="graine de génération, pour des grilles identiques d'une exécution à l'autre")
+    parser.add_argument('--files', nargs='*', default=[],
+                        help="labyrinthes supplémentaires à résoudre (CSV ou binaire .maze)")
+    parser.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS), default=['dfs', 'bfs', 'astar', 'jps', 'bidir'],
+                        help="algorithmes à comparer")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="ne pas mesurer le pic de mémoire")
+    parser.add_argument('--json', metavar='FICHIER', default=None,
+                        help="fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    records = []
+    # Chaque grille est décrite par son nom et ses paramètres de génération
+    cases = [(path, {'maze': path}, lambda path=path: grid_load(path)) for path in args.files]
+    for size in args.sizes:
+        for density in args.densities:
+            title = '{0} {1}x{1}, densité {2}, graine {3}'.format(args.kind, size, density, args.seed)
+            params = {'maze': args.kind, 'size': size, 'density': density, 'seed': args.seed}
+            cases.append((title, params, lambda size=size, density=density:
+                          GENERATORS[args.kind](size, density, args.seed)))
+
+    for title, params, load in cases:
+        grid = load()
+        params['walls'] = float(np.count_nonzero(grid == 1)) / grid.size
+        results = benchmark(grid, args.solvers, not args.no_memory)
+        results_show('{0} (murs : {1:.1%})'.format(title, params['walls']), results)
+        records.extend(dict(params, **r) for r in results)
+
+    if args.json is not None:
+        with open(args.json, 'w') as json_out:
+            json.dump({
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'results': records,
+            }, json_out, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#########################
+#####    Imports    #####
+#########################
+import os               # Chemins du cache sur disque
+import hashlib          # Empreinte de la grille pour le cache
+import argparse         # Options de la ligne de commande
+from collections import deque   # File du parcours en largeur
+from array import array # Tableaux compacts d'entiers
+import numpy as np      # Champ de distances compact
+
+from labyrinth import DIRECTIONS, grid_flatten, grid_load
+
+#########################
+### Champ de distances ##
+#########################
+# Lorsque le labyrinthe est fixe et que l'on cherche des chemins depuis de nombreux départs,
+# un seul parcours en largeur depuis les arrivées suffit : chaque case reçoit sa distance à
+# l'arrivée la plus proche, et un chemin se retrouve en descendant les distances.
+
+# Cache en mémoire des champs déjà calculés, indexé par l'empreinte de la grille et des arrivées
+_cache = {}
+
+# Empreinte d'une grille et de ses arrivées, utilisée comme clé du cache
+# - grid: grille du labyrinthe
+# - goals: liste des cases d'arrivée
+# Renvoie une chaîne hexadécimale
+def grid_hash(grid, goals):
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    digest = hashlib.sha1()
+    digest.update(np.asarray(grid.shape, dtype=np.int64).tobytes())
+    digest.update(grid.tobytes())
+    digest.update(np.asarray(goals, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+# Parcours en largeur depuis toutes les arrivées à la fois
+# - grid: grille du labyrinthe (1 = mur)
+# - goals: liste des cases (i,j) d'arrivée
+# Renvoie un tableau int32 de la taille de la grille : distance à l'arrivée la plus proche,
+# ou -1 pour les murs et les cases inaccessibles
+def distance_field_compute(grid, goals):
+    cells, rows, cols = grid_flatten(grid)
+    dist = array('i', [-1]) * (rows*cols)
+    queue = deque()
+    for (i,j) in goals:
+        dist[i*cols + j] = 0
+        queue.append(i*cols + j)
+
+    while queue:
+        k = queue.popleft()
+        i, j = divmod(k, cols)
+        d = dist[k] + 1
+        for di, dj in DIRECTIONS:
+            ni, nj = i + di, j + dj
+            if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                continue
+            nk = ni*cols + nj
+            if cells[nk] == 1 or dist[nk] != -1:
+                continue
+            dist[nk] = d
+            queue.append(nk)
+
+    return np.frombuffer(dist, dtype=np.int32).reshape(rows, cols)
+
+# Champ de distances d'un labyrinthe vers un ensemble d'arrivées
+class DistanceField:
+    # - field: tableau des distances (voir distance_field_compute)
+    # - goals: liste des cases d'arrivée
+    def __init__(self, field, goals):
+        self.field = field
+        self.goals = goals
+        self.shape = field.shape
+        # Vue à plat : accès case par case bien plus rapide que l'indexation NumPy
+        self.dist = memoryview(np.ascontiguousarray(field).reshape(-1))
+
+    # Distance d'une case à l'arrivée la plus proche, ou -1 si elle est inaccessible
+    # (ou hors de la grille)
+    def distance(self, start):
+        rows, cols = self.shape
+        i, j = start
+        if not (0 <= i < rows and 0 <= j < cols):
+            return -1
+        return self.dist[i*cols + j]
+
+    # Chemin le plus court depuis une case, en suivant la pente du champ de distances
+    # - start: case (i,j) de départ
+    # Renvoie la liste des cases du départ à l'arrivée, ou None si l'arrivée est inaccessible
+    # (ou si le départ est hors de la grille)
+    def path(self, start):
+        dist = self.dist
+        rows, cols = self.shape
+        i, j = start
+        d = self.distance(start)
+        if d < 0:
+            return None
+
+        path = [(i,j)]
+        # Chaque pas descend d'une unité : coût proportionnel à la longueur du chemin
+        while d > 0:
+            for di, dj in DIRECTIONS:
+                ni, nj = i + di, j + dj
+                if 0 <= ni < rows and 0 <= nj < cols and dist[ni*cols + nj] == d - 1:
+                    i, j, d = ni, nj, d - 1
+                    break
+            else:
+                # Aucune voisine plus proche : le champ ne correspond pas à cette grille
+                return None
+            path.append((i,j))
+        return path
+
+# Champ de distances d'une grille, calculé une seule fois puis mis en cache
+# - grid: grille du labyrinthe
+# - goals: liste des cases d'arrivée (par défaut toutes les cases marquées 2)
+# - cache_dir: dossier du cache sur disque, ou None pour se limiter au cache en mémoire
+# Renvoie un objet DistanceField
+def distance_field(grid, goals=None, cache_dir=None):
+    if goals is None:
+        goals = [tuple(int(x) for x in cell) for cell in np.argwhere(np.asarray(grid) == 2)]
+    key = grid_hash(grid, goals)
+    if key in _cache:
+        return _cache[key]
+
+    cache_path = os.path.join(cache_dir, key + '.npy') if cache_dir is not None else None
+    if cache_path is not None and os.path.isfile(cache_path):
+        field = np.load(cache_path, mmap_mode='r')
+    else:
+        field = distance_field_compute(grid, goals)
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(cache_path, field)
+
+    _cache[key] = DistanceField(field, goals)
+    return _cache[key]
+
+# Main
+def main():
+    parser = argparse.ArgumentParser(description="Chemins vers l'arrivée depuis plusieurs départs.")
+    parser.add_argument('path', help="fichier du labyrinthe (CSV ou binaire .maze)")
+    parser.add_argument('starts', nargs='+', metavar='I,J', help="cases de départ")
+    parser.add_argument('--cache', metavar='DOSSIER', default=None,
+                        help="dossier où conserver les champs de distances calculés")
+    args = parser.parse_args()
+
+    field = distance_field(grid_load(args.path), cache_dir=args.cache)
+    for start in args.starts:
+        i, j = (int(x) for x in start.split(','))
+        path = field.path((i,j))
+        if not (0 <= i < field.shape[0] and 0 <= j < field.shape[1]):
+            print('({0},{1}) : case hors de la grille {2}x{3}'.format(i, j, *field.shape))
+        elif path is None:
+            print('({0},{1}) : arrivée inaccessible'.format(i, j))
+        else:
+            print('({0},{1}) : chemin de longueur {2} jusqu\'à {3}'.format(i, j, len(path)-1, path[-1]))
+
+if __name__ == "__main__":
+    main()
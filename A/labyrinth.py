@@ -3,9 +3,13 @@
 #########################
 import time             # Pour temporiser l'affichage
 from enum import Enum   # Classes énumération
-import os               # Accès aux commandes systèmes
-import sys              # Accès aux options système
-import csv              # Lecture de fichiers CSV
+import sys              # Sortie standard pour l'affichage
+import struct           # En-tête du format binaire
+import numpy as np      # Grille compacte (un octet par case)
+import heapq            # File de priorité (tas binaire) pour A*
+import random           # Génération de labyrinthes
+import argparse         # Options de la ligne de commande
+from array import array # Tableaux compacts d'entiers
 
 # Énumération pour définir les directions possibles
 Direction = Enum('Direction', ['LEFT', 'BOTTOM', 'RIGHT', 'TOP'])
@@ -16,19 +20,60 @@ Direction = Enum('Direction', ['LEFT', 'BOTTOM', 'RIGHT', 'TOP'])
 # Objet global pour la grille
 grid = None
 
+# Format binaire : en-tête (signature, nombre de lignes, nombre de colonnes)
+# suivi des cases, un octet par case, ligne par ligne
+BINARY_MAGIC = b'MAZ1'
+BINARY_HEADER = struct.Struct('<4sII')
+BINARY_EXTENSION = '.maze'
+
 # Initialisation de la grille avec des valeurs par défaut
 # - 0 est utilisé pour marquer une case accessible
 # - 1 est utilisé pour marquer un mur
 # - 2 est utilisé pour marquer l'objectif
 # - 3 est utilisé pour marquer le départ
-def grid_init(): 
+# - path: fichier du labyrinthe (CSV ou binaire .maze)
+def grid_init(path="./labyrinth3.csv"):
     global grid  # L'objet grid utilisé est la variable globale
-    grid=[]
-    # @TODO: Changer le chemin de fichier si besoin. Par défaut, vous pouvez tester avec le labyrinthe 1, puis tester les 2 et 3 
-    with open("./labyrinth3.csv",newline='') as gridfile:
-        reader = csv.reader(gridfile, delimiter=',',quoting=csv.QUOTE_NONNUMERIC)
-        for row in reader:
-            grid.append(row)
+    grid = grid_load(path)
+
+# Chargement d'un labyrinthe, d'après l'extension du fichier
+# - path: fichier CSV (valeurs séparées par des virgules) ou binaire .maze
+# Renvoie la grille sous forme de tableau NumPy uint8 à deux dimensions
+def grid_load(path):
+    if path.endswith(BINARY_EXTENSION):
+        return grid_load_binary(path)
+    return np.loadtxt(path, delimiter=',', dtype=np.uint8, ndmin=2)
+
+# Écriture d'un labyrinthe au format binaire
+# - grid: grille à enregistrer
+# - path: fichier de destination
+def grid_save_binary(grid, path):
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    with open(path, 'wb') as gridfile:
+        gridfile.write(BINARY_HEADER.pack(BINARY_MAGIC, grid.shape[0], grid.shape[1]))
+        gridfile.write(grid.tobytes())
+
+# Lecture d'un labyrinthe au format binaire, projeté en mémoire (mmap)
+# Seul l'en-tête est lu : les cases sont chargées par le système à la demande.
+# Les modifications (marquage du chemin) restent en mémoire et ne touchent pas au fichier.
+# - path: fichier .maze
+# Renvoie la grille sous forme de tableau NumPy uint8 à deux dimensions
+def grid_load_binary(path):
+    with open(path, 'rb') as gridfile:
+        magic, rows, cols = BINARY_HEADER.unpack(gridfile.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError("{0} n'est pas un labyrinthe au format binaire".format(path))
+    return np.memmap(path, dtype=np.uint8, mode='c', offset=BINARY_HEADER.size, shape=(rows, cols))
+
+# Recherche de la première case portant une valeur donnée
+# - grid: grille du labyrinthe
+# - value: valeur recherchée
+# Renvoie la case (i,j), ou None si aucune case ne porte cette valeur
+def grid_find(grid, value):
+    found = np.flatnonzero(np.asarray(grid) == value)
+    if len(found) == 0:
+        return None
+    return divmod(int(found[0]), np.shape(grid)[1])
 
 # Trouve la case de départ
 # - Si aucune case n'est trouvée pour le départ, commence sur la case en haut à gauche
@@ -36,63 +81,532 @@ def maze_starting_cell():
     global grid  # L'objet grid utilisé est la variable globale
 
     # Rechercher toute la grille pour trouver une case marquée 3
-    for i in range(0,len(grid)):
-        for j in range(0,len(grid[0])):
-            if (grid[i][j]==3): return (i,j)
+    start = grid_find(grid, 3)
 
     # Si rien n'est trouvé après parcours complet, renvoyer la case en haut à gauche (1,1)
-    return (1,1)
+    return start if start is not None else (1,1)
+
+# Trouve la case d'arrivée
+# - Renvoie None si aucune case n'est marquée 2
+def maze_goal_cell():
+    global grid  # L'objet grid utilisé est la variable globale
+
+    return grid_find(grid, 2)
 
 # Démarre la résolution
-def maze_solve():
+# - renderer: afficheur du terminal, ou None pour résoudre sans aucun affichage
+# - solver: nom de l'algorithme de résolution (voir SOLVERS)
+def maze_solve(renderer=None, solver='astar'):
     global grid  # L'objet grid utilisé est la variable globale
 
     # Partir de la case de départ
     (i_start,j_start) = maze_starting_cell()
     grid[i_start][j_start] = 0
-    maze_solve_depth(i_start,j_start)
-    
+    goal = maze_goal_cell()
+    if goal is None:
+        return
+
+    observer = None
+    if renderer is not None:
+        renderer.draw()
+        observer = renderer.update
+
+    # L'afficheur est fermé sur tous les chemins de sortie, pour écrire les dernières
+    # modifications et replacer le curseur sous la grille
+    try:
+        path, expanded = SOLVERS[solver](grid, (i_start,j_start), goal, observer)
+        if path is not None:
+            # Marquer le chemin trouvé (sauf l'arrivée)
+            for (i,j) in path[:-1]:
+                grid[i][j] = 4
+                if renderer is not None:
+                    renderer.update(i, j, 4)
+    finally:
+        if renderer is not None:
+            renderer.close()
+
+    if path is None:
+        print('Arrivée inaccessible - cases développées :', expanded)
+    else:
+        print('Longueur du chemin :', len(path)-1, '- cases développées :', expanded)
+
 #########################
 ##### Algorithme A* #####
 #########################
 
-# Recherche en profondeur par algorithme A*
-# - i,j: Case en cours de validation
+# Déplacements possibles : gauche, bas, droite, haut
+DIRECTIONS = [(-1,0), (0,1), (1,0), (0,-1)]
+
+# Distance de Manhattan entre deux cases (heuristique admissible pour A*)
+def manhattan(a,b):
+    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+
+# Mise à plat de la grille : les cases sont numérotées k = i*cols + j
+# Aucune copie pour une grille uint8 contiguë (y compris projetée en mémoire)
+# - grid: grille du labyrinthe
+# Renvoie (cases, rows, cols) où cases[k] est la valeur entière de la case k
+def grid_flatten(grid):
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    rows, cols = grid.shape
+    return memoryview(grid.reshape(-1)), rows, cols
+
+# Reconstruit le chemin à partir des pointeurs parents
+# - parent: tableau case -> case précédente (-1 pour le départ)
+# - goal: numéro de la case d'arrivée
+# - cols: nombre de colonnes de la grille
+# Renvoie la liste des cases (i,j) du départ à l'arrivée
+def path_rebuild(parent, goal, cols):
+    path = []
+    k = goal
+    while k != -1:
+        path.append(divmod(k, cols))
+        k = parent[k]
+    path.reverse()
+    return path
+
+# Recherche du plus court chemin par algorithme A*
+# - grid: grille du labyrinthe (1 = mur)
+# - start, goal: cases (i,j) de départ et d'arrivée
+# - observer: fonction (i, j, valeur) appelée à chaque case développée, ou None
 # Renvoie
-# - Vrai si l'arrivée est atteinte
-# - Faux si on tombe sur une impasse
-def maze_solve_depth(i,j):
-    global grid  # L'objet grid utilisé est la variable globale
+# - le chemin optimal (liste de cases, départ et arrivée inclus), ou None si l'arrivée est inaccessible
+# - le nombre de cases développées
+def maze_solve_astar(grid, start, goal, observer=None):
+    cells, rows, cols = grid_flatten(grid)
+    gi, gj = goal
+    k_start, k_goal = start[0]*cols + start[1], gi*cols + gj
+
+    # Tables de taille fixe (une entrée par case) plutôt que des dictionnaires :
+    # la mémoire reste bornée même pour des millions de cases
+    g_score = array('i', [-1]) * (rows*cols)
+    parent = array('i', [-1]) * (rows*cols)
+    closed = bytearray(rows*cols)
+    g_score[k_start] = 0
+
+    # Ensemble ouvert : tas de (f, -g, case). À f égal, on privilégie la case la plus profonde
+    open_heap = [(manhattan(start,goal), 0, k_start)]
+    expanded = 0
+
+    while open_heap:
+        _, neg_g, k = heapq.heappop(open_heap)
+        # Entrée périmée : la case a déjà été développée avec un meilleur coût
+        if closed[k]:
+            continue
+        closed[k] = 1
+        expanded += 1
+        if observer is not None:
+            observer(k // cols, k % cols, 5)
+
+        if k == k_goal:
+            return path_rebuild(parent, k_goal, cols), expanded
 
-    # Vérifier les bornes
-    if i < 0 or i >= len(grid) or j < 0 or j >= len(grid[0]):
-        return False
-    
-    # Si c'est un mur ou déjà visité, on arrête
-    if grid[i][j] == 1 or grid[i][j] == 4:
-        return False
-    # Si c'est l'arrivée
-    if grid[i][j] == 2:
-        path_show()
-        return True
-
-    # Marquer la case comme visitée (4)
-    temp = grid[i][j]
-    grid[i][j] = 4
-    path_show()
-
-    # Explorer les 4 directions : gauche, bas, droite, haut
-    directions = [(-1,0), (0,1), (1,0), (0,-1)]
-    for di, dj in directions:
+        i, j = divmod(k, cols)
+        g = -neg_g + 1
+        for di, dj in DIRECTIONS:
+            ni, nj = i + di, j + dj
+            if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                continue
+            nk = ni*cols + nj
+            if cells[nk] == 1:
+                continue
+            if g_score[nk] == -1 or g < g_score[nk]:
+                g_score[nk] = g
+                parent[nk] = k
+                heapq.heappush(open_heap, (g + abs(ni-gi) + abs(nj-gj), -g, nk))
+
+    return None, expanded
+
+#########################
+#### Parcours profond ###
+#########################
+
+# Recherche en profondeur (premier chemin trouvé, pas forcément le plus court)
+# La pile est explicite : aucune récursion, donc pas de limite sur la longueur des couloirs
+# - grid: grille du labyrinthe (1 = mur)
+# - start, goal: cases (i,j) de départ et d'arrivée
+# - observer: fonction (i, j, valeur) appelée à chaque case empilée ou dépilée, ou None
+# Renvoie
+# - le chemin trouvé (liste de cases, départ et arrivée inclus), ou None si l'arrivée est inaccessible
+# - le nombre de cases visitées
+def maze_solve_depth(grid, start, goal, observer=None):
+    cells, rows, cols = grid_flatten(grid)
+    k_start, k_goal = start[0]*cols + start[1], goal[0]*cols + goal[1]
+
+    # Une case visitée le reste : chaque case entre au plus une fois dans la pile
+    visited = bytearray(rows*cols)
+    # Prochaine direction à essayer pour chaque case de la pile
+    next_dir = bytearray(rows*cols)
+    stack = array('i', [k_start])
+    visited[k_start] = 1
+    expanded = 1
+
+    while stack:
+        k = stack[-1]
+        if k == k_goal:
+            return [divmod(c, cols) for c in stack], expanded
+
+        d = next_dir[k]
+        # Toutes les directions ont été essayées : impasse, on revient en arrière
+        if d == len(DIRECTIONS):
+            stack.pop()
+            if observer is not None:
+                observer(k // cols, k % cols, cells[k])
+            continue
+        next_dir[k] = d + 1
+
+        i, j = divmod(k, cols)
+        di, dj = DIRECTIONS[d]
         ni, nj = i + di, j + dj
-        if maze_solve_depth(ni, nj):
-            return True
+        if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+            continue
+        nk = ni*cols + nj
+        if cells[nk] == 1 or visited[nk]:
+            continue
+        visited[nk] = 1
+        expanded += 1
+        stack.append(nk)
+        if observer is not None:
+            observer(ni, nj, 4)
+
+    return None, expanded
+
+#########################
+### Jump Point Search ###
+#########################
+# Variante de A* pour les grilles à 4 voisins : au lieu d'ajouter chaque case à l'ensemble
+# ouvert, on avance en ligne droite jusqu'à une case d'intérêt (point de saut).
+# Parmi les plus courts chemins équivalents, on ne garde que ceux qui se déplacent
+# horizontalement le plus tôt possible :
+# - un déplacement horizontal peut continuer ou tourner vers le haut ou le bas ;
+# - un déplacement vertical continue tout droit, et ne tourne que si la case latérale
+#   n'était pas accessible depuis la case précédente (voisin forcé).
+
+# Saut vertical depuis une case
+# - cells, rows, cols: grille à plat (voir grid_flatten)
+# - i,j: case de départ du saut
+# - di: sens du déplacement (-1 vers le haut, 1 vers le bas)
+# - k_goal: numéro de la case d'arrivée
+# Renvoie le numéro du point de saut atteint, ou -1 si le saut bute sur un mur
+def jump_vertical(cells, rows, cols, i, j, di, k_goal):
+    while True:
+        i += di
+        if i < 0 or i >= rows:
+            return -1
+        k = i*cols + j
+        if cells[k] == 1:
+            return -1
+        if k == k_goal:
+            return k
+        # Voisin forcé : case latérale libre alors que sa voisine sur la ligne précédente est un mur
+        back = k - di*cols
+        if j > 0 and cells[k-1] != 1 and cells[back-1] == 1:
+            return k
+        if j < cols-1 and cells[k+1] != 1 and cells[back+1] == 1:
+            return k
+
+# Saut horizontal depuis une case
+# À chaque pas, on regarde si un saut vertical mène à un point de saut
+# - cells, rows, cols: grille à plat (voir grid_flatten)
+# - i,j: case de départ du saut
+# - dj: sens du déplacement (-1 vers la gauche, 1 vers la droite)
+# - k_goal: numéro de la case d'arrivée
+# Renvoie le numéro du point de saut atteint, ou -1 si le saut bute sur un mur
+def jump_horizontal(cells, rows, cols, i, j, dj, k_goal):
+    while True:
+        j += dj
+        if j < 0 or j >= cols:
+            return -1
+        k = i*cols + j
+        if cells[k] == 1:
+            return -1
+        if k == k_goal:
+            return k
+        if (jump_vertical(cells, rows, cols, i, j, -1, k_goal) != -1
+                or jump_vertical(cells, rows, cols, i, j, 1, k_goal) != -1):
+            return k
+
+# Recherche du plus court chemin par Jump Point Search
+# - grid: grille du labyrinthe (1 = mur)
+# - start, goal: cases (i,j) de départ et d'arrivée
+# - observer: fonction (i, j, valeur) appelée à chaque point de saut développé, ou None
+# Renvoie
+# - le chemin optimal (liste de cases, départ et arrivée inclus), ou None si l'arrivée est inaccessible
+# - le nombre de points de saut développés
+def maze_solve_jps(grid, start, goal, observer=None):
+    cells, rows, cols = grid_flatten(grid)
+    gi, gj = goal
+    k_start, k_goal = start[0]*cols + start[1], gi*cols + gj
+
+    g_score = array('i', [-1]) * (rows*cols)
+    parent = array('i', [-1]) * (rows*cols)
+    closed = bytearray(rows*cols)
+    g_score[k_start] = 0
+
+    open_heap = [(manhattan(start,goal), 0, k_start)]
+    expanded = 0
 
-    # Backtrack : remettre la case à son état initial
-    grid[i][j] = temp
-    path_show()
-    return False
+    while open_heap:
+        _, neg_g, k = heapq.heappop(open_heap)
+        if closed[k]:
+            continue
+        closed[k] = 1
+        expanded += 1
+        if observer is not None:
+            observer(k // cols, k % cols, 5)
 
+        if k == k_goal:
+            # Les points de saut sont alignés deux à deux : on complète les segments
+            jump_points = path_rebuild(parent, k_goal, cols)
+            path = [jump_points[0]]
+            for (ni, nj) in jump_points[1:]:
+                i, j = path[-1]
+                di, dj = (ni > i) - (ni < i), (nj > j) - (nj < j)
+                while (i, j) != (ni, nj):
+                    i, j = i + di, j + dj
+                    path.append((i, j))
+            return path, expanded
+
+        i, j = divmod(k, cols)
+        g = -neg_g
+
+        # Directions à explorer d'après la direction d'arrivée sur la case
+        if parent[k] == -1:
+            moves = DIRECTIONS
+        else:
+            pi, pj = divmod(parent[k], cols)
+            if pi == i:
+                moves = [(0, (j > pj) - (j < pj)), (-1,0), (1,0)]
+            else:
+                di = (i > pi) - (i < pi)
+                moves = [(di, 0)]
+                back = k - di*cols
+                if j > 0 and cells[k-1] != 1 and cells[back-1] == 1:
+                    moves.append((0,-1))
+                if j < cols-1 and cells[k+1] != 1 and cells[back+1] == 1:
+                    moves.append((0,1))
+
+        for di, dj in moves:
+            if di != 0:
+                nk = jump_vertical(cells, rows, cols, i, j, di, k_goal)
+            else:
+                nk = jump_horizontal(cells, rows, cols, i, j, dj, k_goal)
+            if nk == -1:
+                continue
+            ni, nj = divmod(nk, cols)
+            ng = g + abs(ni-i) + abs(nj-j)
+            if g_score[nk] == -1 or ng < g_score[nk]:
+                g_score[nk] = ng
+                parent[nk] = k
+                heapq.heappush(open_heap, (ng + abs(ni-gi) + abs(nj-gj), -ng, nk))
+
+    return None, expanded
+
+#########################
+### Parcours en largeur #
+#########################
+
+# Recherche en largeur depuis le départ seul
+# Toutes les cases à distance d du départ sont développées avant celles à distance d+1 :
+# le premier chemin qui atteint l'arrivée est le plus court. Sert de référence à la
+# recherche bidirectionnelle.
+# - grid: grille du labyrinthe (1 = mur)
+# - start, goal: cases (i,j) de départ et d'arrivée
+# - observer: fonction (i, j, valeur) appelée à chaque case développée, ou None
+# Renvoie
+# - le chemin optimal (liste de cases, départ et arrivée inclus), ou None si l'arrivée est inaccessible
+# - le nombre de cases développées
+def maze_solve_breadth(grid, start, goal, observer=None):
+    cells, rows, cols = grid_flatten(grid)
+    k_start, k_goal = start[0]*cols + start[1], goal[0]*cols + goal[1]
+
+    parent = array('i', [-1]) * (rows*cols)
+    reached = bytearray(rows*cols)
+    reached[k_start] = 1
+    queue = array('i', [k_start])
+    expanded = 0
+
+    # La file n'est jamais raccourcie : head désigne la prochaine case à développer
+    head = 0
+    while head < len(queue):
+        k = queue[head]
+        head += 1
+        expanded += 1
+        if observer is not None:
+            observer(k // cols, k % cols, 5)
+        if k == k_goal:
+            return path_rebuild(parent, k_goal, cols), expanded
+
+        i, j = divmod(k, cols)
+        for di, dj in DIRECTIONS:
+            ni, nj = i + di, j + dj
+            if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                continue
+            nk = ni*cols + nj
+            if cells[nk] == 1 or reached[nk]:
+                continue
+            reached[nk] = 1
+            parent[nk] = k
+            queue.append(nk)
+
+    return None, expanded
+
+#########################
+#### Bidirectionnelle ###
+#########################
+
+# Remonte les pointeurs parents depuis une case jusqu'à l'origine de sa recherche
+# Renvoie la liste des cases (i,j), de la case donnée jusqu'à l'origine
+def path_to_root(parent, k, cols):
+    path = []
+    while k != -1:
+        path.append(divmod(k, cols))
+        k = parent[k]
+    return path
+
+# Recherche en largeur bidirectionnelle
+# Deux parcours en largeur partent du départ et de l'arrivée ; on développe à chaque fois
+# une couche complète du plus petit des deux fronts, et on s'arrête dès que les fronts se
+# rejoignent. Chaque recherche n'explore qu'environ la moitié de la distance, ce qui réduit
+# la zone explorée par rapport au parcours en largeur depuis le départ seul (maze_solve_breadth).
+# Le gain est d'autant plus grand que les bords de la grille ne limitent pas déjà ce parcours :
+# d'un coin à l'autre d'une grille percée de boucles, il est faible. Sans heuristique, la zone
+# explorée reste en général plus grande que celle de A*.
+# - grid: grille du labyrinthe (1 = mur)
+# - start, goal: cases (i,j) de départ et d'arrivée
+# - observer: fonction (i, j, valeur) appelée à chaque case développée, ou None
+# Renvoie
+# - le chemin optimal (liste de cases, départ et arrivée inclus), ou None si l'arrivée est inaccessible
+# - le nombre de cases développées
+def maze_solve_bidirectional(grid, start, goal, observer=None):
+    cells, rows, cols = grid_flatten(grid)
+    k_start, k_goal = start[0]*cols + start[1], goal[0]*cols + goal[1]
+    if k_start == k_goal:
+        return [start], 0
+
+    # side[k] : 0 si la case n'est pas atteinte, 1 depuis le départ, 2 depuis l'arrivée
+    side = bytearray(rows*cols)
+    parent = array('i', [-1]) * (rows*cols)
+    dist = array('i', [-1]) * (rows*cols)
+    side[k_start], side[k_goal] = 1, 2
+    dist[k_start] = dist[k_goal] = 0
+    frontiers = {1: [k_start], 2: [k_goal]}
+    expanded = 0
+
+    while frontiers[1] and frontiers[2]:
+        s = 1 if len(frontiers[1]) <= len(frontiers[2]) else 2
+        # Meilleure jonction de la couche : (longueur, case côté s, case de l'autre côté)
+        best = None
+        layer = []
+        for k in frontiers[s]:
+            expanded += 1
+            if observer is not None:
+                observer(k // cols, k % cols, 5)
+            i, j = divmod(k, cols)
+            for di, dj in DIRECTIONS:
+                ni, nj = i + di, j + dj
+                if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                    continue
+                nk = ni*cols + nj
+                if cells[nk] == 1 or side[nk] == s:
+                    continue
+                if side[nk] == 0:
+                    side[nk] = s
+                    parent[nk] = k
+                    dist[nk] = dist[k] + 1
+                    layer.append(nk)
+                elif best is None or dist[k] + 1 + dist[nk] < best[0]:
+                    best = (dist[k] + 1 + dist[nk], k, nk)
+
+        # La couche est terminée : la plus courte jonction trouvée est optimale
+        if best is not None:
+            _, k, nk = best
+            near, far = path_to_root(parent, k, cols), path_to_root(parent, nk, cols)
+            if s == 1:
+                near.reverse()
+                return near + far, expanded
+            far.reverse()
+            return far + near, expanded
+        frontiers[s] = layer
+
+    return None, expanded
+
+# Algorithmes de résolution disponibles, sélectionnables en ligne de commande
+SOLVERS = {
+    'astar': maze_solve_astar,
+    'jps': maze_solve_jps,
+    'bfs': maze_solve_breadth,
+    'bidir': maze_solve_bidirectional,
+    'dfs': maze_solve_depth,
+}
+
+#########################
+#####  Génération   #####
+#########################
+
+# Génère un labyrinthe parfait (un seul chemin entre deux cases) par exploration aléatoire
+# - rows, cols: dimensions de la grille (bordure de murs comprise)
+# - seed: graine du générateur aléatoire, pour des labyrinthes reproductibles
+# - density: proportion maximale de murs ; des murs intérieurs sont retirés au hasard
+#   pour l'atteindre, ce qui crée des boucles (None pour garder le labyrinthe parfait)
+# Renvoie une grille avec le départ (3) en haut à gauche et l'arrivée (2) en bas à droite
+def maze_generate(rows, cols, seed=None, density=None):
+    rng = random.Random(seed)
+    cells = bytearray([1]) * (rows*cols)
+
+    # Les cases creusables sont aux coordonnées impaires, les murs entre elles
+    last_i, last_j = (rows-2) - (rows-2+1) % 2, (cols-2) - (cols-2+1) % 2
+    steps = [(-2,0), (0,2), (2,0), (0,-2)]
+    cells[cols + 1] = 0
+    stack = [(1,1)]
+    while stack:
+        i, j = stack[-1]
+        candidates = [(i+di, j+dj) for di, dj in steps
+                      if 1 <= i+di <= last_i and 1 <= j+dj <= last_j and cells[(i+di)*cols + j+dj] == 1]
+        if not candidates:
+            stack.pop()
+            continue
+        ni, nj = rng.choice(candidates)
+        cells[((i+ni)//2)*cols + (j+nj)//2] = 0
+        cells[ni*cols + nj] = 0
+        stack.append((ni, nj))
+
+    cells[cols + 1] = 3
+    cells[last_i*cols + last_j] = 2
+    grid = np.frombuffer(cells, dtype=np.uint8).reshape(rows, cols)
+
+    if density is not None:
+        # Retirer un mur ne peut pas déconnecter le labyrinthe : l'arrivée reste accessible
+        inner = np.zeros((rows, cols), dtype=bool)
+        inner[1:-1,1:-1] = True
+        walls = np.flatnonzero(inner & (grid == 1))
+        excess = int(np.count_nonzero(grid == 1) - density*rows*cols)
+        if excess > 0:
+            removed = np.random.default_rng(seed).choice(walls, min(excess, len(walls)), replace=False)
+            grid.reshape(-1)[removed] = 0
+    return grid
+
+# Test de charge : résolution d'un grand labyrinthe généré
+# Un labyrinthe parfait de 2000x2000 contient des couloirs de centaines de milliers de cases,
+# ce qui faisait exploser la récursion de l'ancienne recherche en profondeur
+# - size: côté de la grille
+# - seed: graine du générateur
+def maze_stress_test(size=2000, seed=0):
+    t0 = time.perf_counter()
+    maze = maze_generate(size, size, seed)
+    print('Génération {0}x{0} : {1:.2f} s'.format(size, time.perf_counter()-t0))
+
+    start, goal = (1,1), (size-2 - (size-1) % 2, size-2 - (size-1) % 2)
+    lengths = []
+    for name, solver in [('profondeur', maze_solve_depth), ('A*', maze_solve_astar)]:
+        t0 = time.perf_counter()
+        path, expanded = solver(maze, start, goal)
+        assert path is not None and path[0] == start and path[-1] == goal
+        lengths.append(len(path)-1)
+        print('{0:<10} : chemin {1}, cases développées {2}, {3:.2f} s'.format(
+            name, len(path)-1, expanded, time.perf_counter()-t0))
+
+    # Labyrinthe parfait : le seul chemin est aussi le plus court
+    assert lengths[0] == lengths[1]
 
 #########################
 #####   Affichage   #####
@@ -105,26 +619,78 @@ def path_int_to_char(n):
         case 2: return '$'
         case 3: return '·'
         case 4: return 'o'
+        case 5: return '.'
+
+# Affichage incrémental dans le terminal
+# La grille est dessinée une seule fois, puis seules les cases modifiées sont réécrites
+# à l'aide de séquences ANSI de déplacement du curseur. Les modifications sont regroupées
+# et envoyées au plus `fps` fois par seconde, quel que soit le rythme de la recherche.
+class TerminalRenderer:
+    # - grid: grille à afficher
+    # - fps: nombre maximal d'images par seconde (0 pour écrire chaque modification immédiatement)
+    # - out: flux de sortie
+    def __init__(self, grid, fps=30, out=sys.stdout):
+        self.grid = grid
+        self.interval = 1/fps if fps > 0 else 0
+        self.out = out
+        self.pending = {}
+        self.last_frame = 0
 
-# Effaçage de la console
-def cls():
-    os.system('cls' if os.name=='nt' else 'clear')
+    # Efface l'écran et dessine la grille complète en une seule écriture
+    def draw(self):
+        lines = [''.join(path_int_to_char(int(v)) for v in row) for row in self.grid]
+        self.out.write('\x1b[2J\x1b[H' + '\n'.join(lines) + '\n')
+        self.out.flush()
+        self.last_frame = time.perf_counter()
 
-# Affiche le labyrinthe avec le chemin suivi
-def path_show():
-    global grid
-    cls()
-    for i in range(0,len(grid)):
-        for j in range(0,len(grid[0])):
-            print(path_int_to_char(grid[i][j]),end='')
-        print('')
-    # time.sleep(0.1) 
+    # Enregistre la nouvelle valeur d'une case, et affiche une image si l'intervalle est écoulé
+    def update(self, i, j, value):
+        self.pending[(i,j)] = value
+        if time.perf_counter() - self.last_frame >= self.interval:
+            self.flush()
+
+    # Réécrit uniquement les cases modifiées depuis la dernière image
+    def flush(self):
+        if self.pending:
+            frame = ''.join('\x1b[{0};{1}H{2}'.format(i+1, j+1, path_int_to_char(v))
+                            for (i,j), v in self.pending.items())
+            # Replacer le curseur sous la grille
+            self.out.write(frame + '\x1b[{0};1H'.format(len(self.grid)+1))
+            self.out.flush()
+            self.pending.clear()
+        self.last_frame = time.perf_counter()
+
+    # Affiche les dernières modifications en attente
+    def close(self):
+        self.flush()
 
 # Main
 def main():
-    sys.setrecursionlimit(5000) # Pour accepter de chercher en profondeur sans risquer la boucle infinie
-    grid_init()
-    path_show()
-    maze_solve()
+    parser = argparse.ArgumentParser(description="Résolution de labyrinthe.")
+    parser.add_argument('path', nargs='?', default="./labyrinth3.csv",
+                        help="fichier du labyrinthe (CSV ou binaire {0})".format(BINARY_EXTENSION))
+    parser.add_argument('--to-binary', metavar='FICHIER', default=None,
+                        help="convertir le labyrinthe au format binaire dans FICHIER, sans le résoudre")
+    parser.add_argument('--stress', metavar='TAILLE', type=int, default=None,
+                        help="générer un labyrinthe TAILLExTAILLE et le résoudre (test de charge)")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='astar',
+                        help="algorithme de résolution")
+    parser.add_argument('--headless', action='store_true',
+                        help="résoudre sans aucun affichage du labyrinthe")
+    parser.add_argument('--fps', type=float, default=30,
+                        help="nombre maximal d'images par seconde de l'affichage (0 = sans limite)")
+    args = parser.parse_args()
+
+    if args.stress is not None:
+        maze_stress_test(args.stress)
+        return
+
+    grid_init(args.path)
+    if args.to_binary is not None:
+        grid_save_binary(grid, args.to_binary)
+        return
+
+    maze_solve(None if args.headless else TerminalRenderer(grid, args.fps), args.solver)
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
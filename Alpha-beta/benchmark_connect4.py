@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import time
+
+import connect4
+import solution_connect4 as solution
+
+
+#####
+# Mesure du temps nécessaire pour atteindre une profondeur donnée, selon le nombre de
+# processus de recherche et le mode parallèle (voir "Recherche parallèle" dans
+# solution_connect4.py). Chaque configuration repart de tables vides.
+###
+
+# Ouvertures de départ, données comme suites de colonnes jouées
+OUVERTURES = [[], [3], [3, 4, 3], [3, 3, 4, 2], [2, 5, 3, 4, 4]]
+
+
+def position(ouverture):
+    etat = connect4.Connect4Etat()
+    for colonne in ouverture:
+        etat.jouer(colonne)
+    return etat
+
+
+# Temps de recherche d'une position jusqu'à une profondeur
+# Retourne un dictionnaire de résultats (temps, coup choisi, profondeur atteinte, noeuds)
+def mesurer(ouverture, profondeur, processus, mode, temps_max):
+    solution.arreter_auxiliaires()
+    solution.PROCESSUS = processus
+    solution.MODE_PARALLELE = mode
+    solution.PROFONDEUR_MAX = profondeur
+    solution.UTILISER_BIBLIOTHEQUE = False
+
+    etat = position(ouverture)
+    debut = time.time()
+    action = solution.joueur_connect4(etat.copie(), connect4.connect4_but, connect4.connect4_transitions,
+                                      etat.joueur, temps_max)
+    temps = time.time() - debut
+    return {
+        'ouverture': ouverture,
+        'processus': processus,
+        'mode': mode,
+        'profondeur_demandee': profondeur,
+        'profondeur': solution.statistiques['profondeur'],
+        'action': action,
+        'temps': temps,
+        'noeuds': solution.statistiques['noeuds'],
+    }
+
+
+#####
+# Execution en tant que script
+###
+DESCRIPTION = "Mesure de l'accélération de la recherche parallèle de Connect4."
+
+
+def buildArgsParser():
+    p = argparse.ArgumentParser(description=DESCRIPTION,
+                                formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    p.add_argument('-profondeur', dest='depth', metavar='INT', type=int, default=9,
+                   help="profondeur à atteindre")
+    p.add_argument('-processus', dest='workers', metavar='INT', type=int, nargs='+',
+                   default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                   help="nombres de processus à comparer")
+    p.add_argument('-modes', dest='modes', nargs='+', choices=['racine', 'lazy_smp'],
+                   default=['racine', 'lazy_smp'], help="modes parallèles à comparer")
+    p.add_argument('-temps', dest='time_limit', metavar='FLOAT', type=float, default=120.0,
+                   help="temps maximal par recherche (en secondes)")
+    p.add_argument('-json', dest='json_file', metavar='FICHIER', default=None,
+                   help="fichier JSON pour enregistrer les résultats")
+
+    return p
+
+
+def main():
+    args = buildArgsParser().parse_args()
+
+    resultats = []
+    for mode in args.modes:
+        print("Mode {0}, profondeur {1}".format(mode, args.depth))
+        print("  {0:>10} {1:>10} {2:>12} {3:>12}".format('processus', 'temps (s)', 'accélération', 'profondeur'))
+        reference = None
+        for processus in args.workers:
+            mesures = [mesurer(ouverture, args.depth, processus, mode, args.time_limit) for ouverture in OUVERTURES]
+            resultats.extend(mesures)
+            temps = sum(m['temps'] for m in mesures)
+            if reference is None:
+                reference = temps
+            print("  {0:>10} {1:>10.2f} {2:>12.2f} {3:>12}".format(
+                processus, temps, reference / temps, min(m['profondeur'] for m in mesures)))
+    solution.arreter_auxiliaires()
+
+    if args.json_file is not None:
+        with open(args.json_file, 'w') as json_out:
+            json_out.write(json.dumps({'cpu': os.cpu_count(), 'resultats': resultats},
+                                      sort_keys=True, indent=4, separators=(',', ': ')))
+
+
+if __name__ == "__main__":
+    main()
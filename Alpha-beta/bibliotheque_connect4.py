@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import time
+
+import connect4
+import solution_connect4 as solution
+
+
+#####
+# Construction de la bibliothèque d'ouvertures (voir "Bibliothèque d'ouvertures" dans
+# solution_connect4.py) : toutes les positions atteignables en au plus N coups sont cherchées
+# à profondeur fixe, en partageant une même table de transposition, puis enregistrées avec leur
+# meilleur coup, leur score et la profondeur cherchée. Le joueur n'utilise une entrée que si elle
+# est plus profonde que ce que sa recherche atteindrait pendant le temps alloué : la profondeur
+# doit dépasser nettement celle de la recherche en partie (environ 11 en 5 s depuis les premiers
+# coups, chaque profondeur supplémentaire doublant à peu près le temps de construction).
+###
+
+# Positions non terminales atteignables en au plus n_coups coups, une seule par paire de
+# positions miroirs
+# Retourne un dictionnaire clé canonique -> état
+def positions(n_coups):
+    etat = connect4.Connect4Etat()
+    bas = solution.bits_du_bas(etat)
+    trouvees = {}
+
+    def parcourir():
+        cle, _ = solution.cle_canonique(etat, bas)
+        if cle in trouvees or connect4.connect4_but(etat) is not None:
+            return
+        trouvees[cle] = etat.copie()
+        if etat.n_coups < n_coups:
+            for colonne in list(etat.coups_possibles()):
+                etat.jouer(colonne)
+                parcourir()
+                etat.annuler()
+
+    parcourir()
+    return trouvees
+
+
+# Cherche chaque position à profondeur fixe
+# Une position dont le résultat est certain (partie gagnée ou perdue, ou cherchée jusqu'à la
+# fin) est enregistrée comme résolue
+# Retourne un dictionnaire clé canonique -> (score, coup, profondeur)
+def construire(n_coups, profondeur, verbose=True):
+    a_chercher = positions(n_coups)
+    solution.PROFONDEUR_MAX = profondeur
+    table = solution.TableTransposition()
+    historique = None
+    entrees = {}
+    debut = time.time()
+
+    # Les positions les plus avancées d'abord : leurs résultats, gardés dans la table,
+    # accélèrent la recherche des positions qui y mènent
+    for i, (cle, etat) in enumerate(sorted(a_chercher.items(), key=lambda e: -e[1].n_coups)):
+        if historique is None:
+            historique = [[0] * (etat.n_colonnes * (etat.n_rangees + 1)) for _ in range(2)]
+        table.nouvelle_recherche()
+        stats = {'noeuds': 0, 'coupures': 0, 'coupures_premier_coup': 0, 'profondeur': 0}
+        alpha_beta, approfondir = solution.preparer_recherche(etat, connect4.connect4_but, table, historique,
+                                                              [float('inf')], stats)
+        approfondir(etat)
+        score, coup = alpha_beta(etat, stats['profondeur'], float('-inf'), float('inf'), etat.n_coups % 2 == 0)
+
+        # La clé canonique peut être celle du miroir : le coup enregistré est alors le coup miroir
+        _, est_miroir = solution.cle_canonique(etat, solution.bits_du_bas(etat))
+        profondeur_cherchee = stats['profondeur']
+        if (abs(score) >= solution.SCORE_VICTOIRE
+                or profondeur_cherchee >= etat.n_colonnes * etat.n_rangees - etat.n_coups):
+            profondeur_cherchee = solution.PROFONDEUR_RESOLUE
+        entrees[cle] = (score, etat.n_colonnes - 1 - coup if est_miroir else coup, profondeur_cherchee)
+
+        if verbose and (i + 1) % 100 == 0:
+            print("{0}/{1} positions ({2:.0f} s)".format(i + 1, len(a_chercher), time.time() - debut))
+    return entrees
+
+
+#####
+# Execution en tant que script
+###
+DESCRIPTION = "Construction de la bibliothèque d'ouvertures de Connect4."
+
+
+def buildArgsParser():
+    p = argparse.ArgumentParser(description=DESCRIPTION,
+                                formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    p.add_argument('-coups', dest='plies', metavar='INT', type=int, default=2,
+                   help="nombre de coups joués des positions les plus avancées de la bibliothèque")
+    p.add_argument('-profondeur', dest='depth', metavar='INT', type=int, default=14,
+                   help="profondeur de recherche de chaque position (au-delà de celle atteinte en partie)")
+    p.add_argument('-sortie', dest='output', metavar='FICHIER', default=solution.FICHIER_BIBLIOTHEQUE,
+                   help="fichier de la bibliothèque")
+
+    return p
+
+
+def main():
+    args = buildArgsParser().parse_args()
+
+    debut = time.time()
+    entrees = construire(args.plies, args.depth)
+    etat = connect4.Connect4Etat()
+    solution.ecrire_bibliotheque(args.output, entrees, etat.n_colonnes, etat.n_rangees)
+    print("{0} positions enregistrées dans {1} en {2:.0f} s".format(len(entrees), args.output, time.time() - debut))
+
+
+if __name__ == "__main__":
+    main()
@@ -95,7 +95,7 @@ class Jeu:
             data = json.loads(open(self.json_file).read())
 
         data['moves'].append({'column': action,
-                              'row': etat.n_rangees - np.sum(etat.tableau.T[action] != ' '),
+                              'row': etat.n_rangees - etat.hauteurs[action],
                               'time': round(temps, 1),
                               'message': msg
                               })
@@ -185,12 +185,117 @@ class Jeu:
 #####
 # Etat, transitions et but pour le Connect4
 ###
+# Le plateau est représenté par deux bitboards (un entier par joueur) : la case de la rangée r
+# (comptée depuis le bas) de la colonne c correspond au bit c * (n_rangees + 1) + r. Chaque
+# colonne a un bit de garde au-dessus de sa dernière rangée, ce qui empêche les alignements de
+# déborder d'une colonne sur la suivante. Jouer un coup, trouver le joueur dont c'est le tour
+# et tester un alignement de quatre ne coûtent que quelques opérations sur des entiers.
+#
+# Les recherches jouent et annulent les coups sur place (jouer / annuler), sans copier l'état ;
+# connect4_transitions, qui construit un état par coup possible, reste disponible pour Jeu et
+# les joueurs qui l'utilisent.
 class Connect4Etat:
 
     def __init__(self):
         self.n_colonnes = 8
         self.n_rangees = 6
-        self.tableau = np.array([[' '] * self.n_colonnes] * self.n_rangees)
+        self.pions_x = 0                            # Bitboard des pions de X
+        self.pions_o = 0                            # Bitboard des pions de O
+        self.hauteurs = [0] * self.n_colonnes       # Nombre de pions dans chaque colonne
+        self.n_coups = 0                            # Nombre de pions sur le plateau
+        self.dernier_coup = None                    # Colonne du dernier pion joué
+        self.historique = []                        # Colonnes jouées, pour annuler les coups
+
+    def copie(self):
+        etat = Connect4Etat.__new__(Connect4Etat)
+        etat.n_colonnes = self.n_colonnes
+        etat.n_rangees = self.n_rangees
+        etat.pions_x = self.pions_x
+        etat.pions_o = self.pions_o
+        etat.hauteurs = self.hauteurs[:]
+        etat.n_coups = self.n_coups
+        etat.dernier_coup = self.dernier_coup
+        etat.historique = self.historique[:]
+        return etat
+
+    # copy.deepcopy (utilisé par Jeu) se contente d'une copie des entiers et des hauteurs
+    def __deepcopy__(self, memo):
+        return self.copie()
+
+    # Joueur dont c'est le tour : X commence, les joueurs alternent
+    @property
+    def joueur(self):
+        return 'X' if self.n_coups % 2 == 0 else 'O'
+
+    # Bit de la case libre la plus basse d'une colonne
+    def bit_libre(self, colonne):
+        return 1 << (colonne * (self.n_rangees + 1) + self.hauteurs[colonne])
+
+    def colonne_libre(self, colonne):
+        return self.hauteurs[colonne] < self.n_rangees
+
+    # Colonnes dans lesquelles on peut encore jouer, générées à la demande
+    def coups_possibles(self):
+        for c in range(self.n_colonnes):
+            if self.hauteurs[c] < self.n_rangees:
+                yield c
+
+    # Ajoute un pion du joueur courant dans une colonne (sur place)
+    def jouer(self, colonne):
+        if self.n_coups % 2 == 0:
+            self.pions_x |= self.bit_libre(colonne)
+        else:
+            self.pions_o |= self.bit_libre(colonne)
+        self.hauteurs[colonne] += 1
+        self.n_coups += 1
+        self.dernier_coup = colonne
+        self.historique.append(colonne)
+
+    # Retire le dernier pion joué (sur place)
+    def annuler(self):
+        colonne = self.historique.pop()
+        self.hauteurs[colonne] -= 1
+        self.n_coups -= 1
+        bit = self.bit_libre(colonne)
+        if self.n_coups % 2 == 0:
+            self.pions_x ^= bit
+        else:
+            self.pions_o ^= bit
+        self.dernier_coup = self.historique[-1] if self.historique else None
+
+    # Vrai si le dernier pion joué complète un alignement de quatre
+    # Seules les quatre lignes qui passent par ce pion sont parcourues, dans les deux sens
+    def dernier_coup_gagnant(self):
+        if self.dernier_coup is None:
+            return False
+        pions = self.pions_o if self.n_coups % 2 == 0 else self.pions_x
+        h = self.n_rangees + 1
+        bit = 1 << (self.dernier_coup * h + self.hauteurs[self.dernier_coup] - 1)
+        # Décalages : vertical, horizontal, diagonale montante, diagonale descendante
+        for decalage in (1, h, h + 1, h - 1):
+            n = 1
+            b = bit << decalage
+            while pions & b:
+                n += 1
+                b <<= decalage
+            b = bit >> decalage
+            while pions & b:
+                n += 1
+                b >>= decalage
+            if n >= 4:
+                return True
+        return False
+
+    # Tableau de caractères équivalent (rangée 0 en haut), pour l'affichage et les anciens codes
+    @property
+    def tableau(self):
+        tableau = np.array([[' '] * self.n_colonnes] * self.n_rangees)
+        h = self.n_rangees + 1
+        for c in range(self.n_colonnes):
+            for r in range(self.hauteurs[c]):
+                bit = 1 << (c * h + r)
+                tableau[self.n_rangees - 1 - r, c] = 'X' if self.pions_x & bit else 'O'
+        return tableau
 
     def __str__(self):
         ret = ''
@@ -204,62 +309,27 @@ class Connect4Etat:
         return ret
 
 
+# Dictionnaire action -> état suivant, construit à partir de jouer (compatibilité)
 def connect4_transitions(etat):
-    # Determiner c'est le tour à qui
-    if np.sum(etat.tableau == 'X') > np.sum(etat.tableau == 'O'):
-        symbol = 'O'
-    else:
-        symbol = 'X'
-
     actions = {}
-    for i in range(etat.n_colonnes):
-        try:
-            rangee_pour_i = np.nonzero(etat.tableau.T[i] == ' ')[0].max()
-            nouvel_etat = copy.deepcopy(etat)
-            nouvel_etat.tableau[rangee_pour_i, i] = symbol
-            actions[i] = nouvel_etat
-        except:
-            pass
+    for i in etat.coups_possibles():
+        nouvel_etat = etat.copie()
+        nouvel_etat.jouer(i)
+        actions[i] = nouvel_etat
 
     return actions
 
 
 def connect4_but(etat):
-    def symbol_gagne(symbol):
-        gagne = False
-        # for i in range(etat.n_rangees):
-        #    for j in range(etat.n_colonnes):
-        if np.sum(etat.tableau == symbol) == 0:
-            return False
-
-        x, y = np.nonzero(etat.tableau == symbol)
-        for i, j in zip(x, y):
-            # Vérifie 4 pareil sur une rangée...
-            gagne |= np.sum(etat.tableau[i, j:j + 4] == symbol) == 4
-            # ... sur une colonne
-            gagne |= np.sum(etat.tableau[i:i + 4, j] == symbol) == 4
-            # ... sur une diagonale gauche-droite
-            gagne |= np.sum(np.diag(etat.tableau[i:i + 4, j:j + 4]) == symbol) == 4
-            # ... sur une diagonale droite-gauche
-            gagne |= np.sum(np.diag(etat.tableau[i - 4 + 1:i + 1, j:j + 4][::-1]) == symbol) == 4
-
-            if gagne:
-                return gagne
-
-        return gagne
-
-    # Vérifie si X a gagné
-    X_gagne = symbol_gagne('X')
-    if X_gagne:
-        return 100000 + np.sum(etat.tableau == ' ')
+    cases_vides = etat.n_colonnes * etat.n_rangees - etat.n_coups
 
-    # Vérifie si O a gagné
-    O_gagne = symbol_gagne('O')
-    if O_gagne:
-        return -100000 - np.sum(etat.tableau == ' ')
+    # Seul le joueur qui vient de jouer peut avoir complété un alignement,
+    # et seulement sur une ligne qui passe par son dernier pion
+    if etat.dernier_coup_gagnant():
+        return 100000 + cases_vides if etat.n_coups % 2 == 1 else -100000 - cases_vides
 
     # Vérifie si c'est une partie nulle
-    if np.sum(etat.tableau != ' ') == etat.n_colonnes * etat.n_rangees:
+    if cases_vides == 0:
         return 0
 
     return None
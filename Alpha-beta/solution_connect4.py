@@ -1,110 +1,795 @@
 # -*- coding: utf-8 -*-
 
+import os
+import math
+import mmap
 import random
-import numpy as np
+import struct
 import time
-
-######################
-# Solution Connect 4 #
-######################
+import multiprocessing
+from array import array
 
 #####
-# joueur_connect4 : Fonction qui calcule le prochain coup optimal pour gagner la
-#                   la partie de Connect4 à l'aide d'Alpha-Beta Prunning.
+# Table de transposition
 #
-# etat: Objet de la classe Connect4Etat indiquant l'état actuel du jeu.
+# Une même position est atteinte par de nombreux ordres de coups : la table mémorise, pour
+# chaque position déjà cherchée, la profondeur de la recherche, le score obtenu, le type de ce
+# score (exact, borne inférieure ou supérieure, selon la coupure alpha-beta) et le meilleur coup.
 #
-# fct_but: Fonction qui prend en entrée un objet de la classe Connect4Etat et
-#          qui retourne le score actuel tu plateau. Si le score est positif, les 'X' ont l'avantage
-#          si c'est négatif ce sont les 'O' qui ont l'avantage, si c'est 0 la partie est nulle.
+# La clé d'une position vient directement des bitboards de Connect4Etat : pions du joueur dont
+# c'est le tour + cases occupées + bit du bas de chaque colonne. Elle est unique (la somme fait
+# apparaître, dans chaque colonne, un bit juste au-dessus du dernier pion), tient sur 64 bits et
+# se calcule en trois opérations : pas besoin de clés de Zobrist.
 #
-# fct_transitions: Fonction qui prend en entrée un objet de la classe Connect4Etat et 
-#                   qui retourne une liste de tuples actions-états voisins pour l'état donné.
+# La mémoire est fixée à la création. Chaque entrée tient en deux mots de 64 bits : les données
+# (score, profondeur, type, coup et génération) et la clé combinée aux données par un ou
+# exclusif. Une entrée dont les deux mots ne proviennent pas de la même écriture (écritures
+# simultanées de plusieurs processus sur une table partagée) ne correspond alors à aucune clé
+# et est simplement ignorée : la table peut être partagée sans verrou.
+# Une entrée est remplacée si elle est vide, si elle date d'un coup précédent de la partie,
+# ou si la nouvelle recherche est au moins aussi profonde.
+###
+TAILLE_TABLE_MO = 64
+
+EXACT = 0
+BORNE_INF = 1       # Le score réel est supérieur ou égal (coupure beta)
+BORNE_SUP = 2       # Le score réel est inférieur ou égal (aucun coup n'a dépassé alpha)
+
+# Mot de données : score + 2**31 (bits 0-31), profondeur (32-47), type (48-49),
+# coup + 1 (50-53, 0 si aucun) et génération (54-63). Un mot nul marque une entrée vide.
+DECALAGE_SCORE = 1 << 31
+
+
+class TableTransposition:
+    # taille_mo: Mémoire occupée par la table, en Mo
+    # partagee: Placer la table en mémoire partagée, pour les processus créés ensuite (fork)
+    def __init__(self, taille_mo=TAILLE_TABLE_MO, partagee=False):
+        # Taille impaire : les bits de poids faible de la clé ne décrivent que les premières
+        # colonnes, un modulo par une puissance de deux ne garderait qu'eux
+        self.taille = (int(taille_mo * 2**20) // 16) | 1
+        if partagee:
+            tampon = multiprocessing.get_context('fork').RawArray('B', 16 * self.taille)
+            mots = memoryview(tampon).cast('B').cast('Q')
+            self.cles, self.donnees = mots[:self.taille], mots[self.taille:]
+        else:
+            self.cles = array('Q', [0]) * self.taille
+            self.donnees = array('Q', [0]) * self.taille
+        self.generation = 0
+
+    # À appeler au début de chaque coup : les entrées des coups précédents restent lisibles,
+    # mais deviennent prioritaires pour le remplacement
+    def nouvelle_recherche(self):
+        self.generation = (self.generation + 1) & 0x3FF
+
+    # Retourne (profondeur, score, type, coup) pour une clé, ou None si elle est absente
+    def lire(self, cle):
+        i = cle % self.taille
+        d = self.donnees[i]
+        if d == 0 or self.cles[i] ^ d != cle:
+            return None
+        coup = ((d >> 50) & 0xF) - 1
+        return (d >> 32) & 0xFFFF, (d & 0xFFFFFFFF) - DECALAGE_SCORE, (d >> 48) & 0x3, (coup if coup >= 0 else None)
+
+    def ecrire(self, cle, profondeur, score, type_score, coup):
+        i = cle % self.taille
+        ancienne = self.donnees[i]
+        if (ancienne != 0 and self.cles[i] ^ ancienne != cle
+                and ancienne >> 54 == self.generation and (ancienne >> 32) & 0xFFFF > profondeur):
+            return
+        d = ((score + DECALAGE_SCORE) | (min(profondeur, 0xFFFF) << 32) | (type_score << 48)
+             | ((coup + 1 if coup is not None else 0) << 50) | (self.generation << 54))
+        self.donnees[i] = d
+        self.cles[i] = cle ^ d
+
+
+# La table est conservée d'un coup à l'autre de la partie (un module est chargé par joueur)
+_table = None
+
+
+#####
+# Gestion du temps
 #
-# str_joueur: String indiquant c'est à qui de jouer : les 'X' ou 'O'.
+# Jeu redonne à chaque coup le temps non utilisé (sans dépasser le maximum) et disqualifie un
+# joueur dont le temps alloué tombe sous FACTEUR_DISQUALIFICATION fois le maximum. Ne jamais
+# dépasser le temps alloué garantit qu'il ne diminue jamais : la recherche est interrompue à
+# MARGE_TEMPS du temps alloué, la marge couvrant les copies et appels faits par Jeu.
 #
-# int_tempsMaximal: Entier indiquant le temps, en secondes, alloué pour prendre une décision.
+# Approfondissement itératif : on cherche à profondeur 1, 2, 3... en gardant le meilleur coup
+# de la dernière profondeur terminée. Une itération n'est lancée que si sa durée estimée
+# (durée de la précédente multipliée par le facteur de branchement effectif observé) tient
+# dans le temps restant ; sinon le temps serait perdu dans une recherche abandonnée.
+###
+MARGE_TEMPS = 0.9
+BRANCHEMENT_MIN = 2.0       # Facteur de branchement supposé au minimum
+BRANCHEMENT_MAX = 8.0       # ... et au maximum (une colonne par coup possible)
+
+# Profondeur maximale de l'approfondissement itératif (None : jusqu'à la fin de la partie)
+PROFONDEUR_MAX = None
+
+
+# La prochaine itération a-t-elle le temps de se terminer ?
+# durees: Durées des itérations déjà terminées
+def iteration_possible(durees, echeance):
+    branchement = BRANCHEMENT_MIN
+    if len(durees) >= 2 and durees[-2] > 0:
+        branchement = min(BRANCHEMENT_MAX, max(BRANCHEMENT_MIN, durees[-1] / durees[-2]))
+    return time.time() + durees[-1] * branchement <= echeance
+
+# Demi-largeur de la fenêtre d'aspiration autour du score de l'itération précédente,
+# en unités de l'évaluation
+FENETRE_ASPIRATION = 8
+
+# Score minimal d'une position gagnée (voir connect4_but)
+SCORE_VICTOIRE = 100000
+
+#####
+# Évaluation des positions non terminales
 #
-# retour: Cette fonction retourne l'action optimal à joeur pour le joueur actuel c.-à-d. 'str_joueur'.
-###  
-def joueur_connect4(etat, fct_but, fct_transitions, str_joueur, int_tempsMaximal):
-    
-    profondeur_max = 1000
-    
-    temps_debut = time.time()
-    
-    def alpha_beta(etat_courant, profondeur, alpha, beta, maximizing_player, temps_debut, temps_max):
-        if time.time() - temps_debut > temps_max * 0.95:
+# Chaque fenêtre de quatre cases alignées qui ne contient aucun pion adverse est une ligne
+# encore ouverte pour un joueur. On compte, pour chaque joueur :
+#   - les fenêtres ouvertes avec deux ou trois de ses pions ;
+#   - ses menaces : cases vides qui compléteraient un alignement de quatre. Une menace sur une
+#     rangée impaire (en comptant depuis le bas à partir de 1) favorise X, qui joue en premier,
+#     et une menace sur une rangée paire favorise O (fin de partie par zugzwang) ;
+#   - ses pions dans les colonnes centrales, qui appartiennent au plus grand nombre de fenêtres.
+# Le score est la somme pondérée pour X moins celle pour O.
+#
+# Les fenêtres ne sont pas parcourues une à une : pour chaque direction, un masque précalculé
+# marque les cases où une fenêtre peut commencer, et les pions des quatre cases de chaque
+# fenêtre sont additionnés en parallèle sur tout le plateau, bit par bit, par décalages.
+###
+POIDS_EVALUATION = {
+    'deux': 1,                  # Fenêtre ouverte avec deux pions
+    'trois': 4,                 # Fenêtre ouverte avec trois pions
+    'menace': 8,                # Menace sur une rangée de la mauvaise parité
+    'menace_parite': 20,        # Menace sur une rangée de la bonne parité
+    'centre': 2,                # Pion dans une colonne centrale
+}
+
+
+# Tables précalculées pour une taille de plateau
+class TablesEvaluation:
+    def __init__(self, n_colonnes, n_rangees):
+        h = n_rangees + 1
+        self.h = h
+        self.plateau = sum(((1 << n_rangees) - 1) << (c * h) for c in range(n_colonnes))
+
+        # Cases de départ des fenêtres pour chaque décalage : vertical, horizontal,
+        # diagonale montante, diagonale descendante
+        def cases(condition):
+            return sum(1 << (c * h + r) for c in range(n_colonnes) for r in range(n_rangees) if condition(c, r))
+        self.fenetres = [
+            (1, cases(lambda c, r: r + 3 < n_rangees)),
+            (h, cases(lambda c, r: c + 3 < n_colonnes)),
+            (h + 1, cases(lambda c, r: c + 3 < n_colonnes and r + 3 < n_rangees)),
+            (h - 1, cases(lambda c, r: c + 3 < n_colonnes and r >= 3)),
+        ]
+        # Rangées impaires en comptant depuis le bas à partir de 1 (indices 0, 2, 4...)
+        self.rangees_impaires = cases(lambda c, r: r % 2 == 0)
+        self.centre = cases(lambda c, r: abs(2 * c - (n_colonnes - 1)) <= 1)
+
+    # Nombre de fenêtres ouvertes (sans pion adverse) contenant deux et trois pions du joueur
+    def fenetres_ouvertes(self, pions, adverses):
+        deux = trois = 0
+        for d, departs in self.fenetres:
+            # Fenêtres sans pion adverse
+            ouvertes = departs & ~(adverses | (adverses >> d) | (adverses >> 2 * d) | (adverses >> 3 * d))
+            # Additionneur bit à bit des quatre cases : n = 4*haut + 2*milieu + bas
+            a, b, c, e = pions, pions >> d, pions >> 2 * d, pions >> 3 * d
+            s1, r1 = a ^ b, a & b
+            s2, r2 = c ^ e, c & e
+            bas = s1 ^ s2
+            r0 = s1 & s2
+            milieu = r1 ^ r2 ^ r0
+            haut = (r1 & r2) | (r0 & (r1 ^ r2))
+            sans_quatre = ouvertes & ~haut & milieu
+            deux += (sans_quatre & ~bas).bit_count()
+            trois += (sans_quatre & bas).bit_count()
+        return deux, trois
+
+    # Cases vides qui compléteraient un alignement de quatre pour le joueur
+    def menaces(self, pions, occupees):
+        h = self.h
+        r = (pions << 1) & (pions << 2) & (pions << 3)
+        for d in (h, h + 1, h - 1):
+            p = (pions << d) & (pions << 2 * d)
+            r |= p & (pions << 3 * d)
+            r |= p & (pions >> d)
+            p = (pions >> d) & (pions >> 2 * d)
+            r |= p & (pions << d)
+            r |= p & (pions >> 3 * d)
+        return r & self.plateau & ~occupees
+
+
+_tables_evaluation = {}
+
+
+# Évaluation d'une position non terminale, positive si X a l'avantage
+# poids: Dictionnaire de poids (par défaut POIDS_EVALUATION)
+def evaluer(etat, poids=None):
+    if poids is None:
+        poids = POIDS_EVALUATION
+    tables = _tables_evaluation.get((etat.n_colonnes, etat.n_rangees))
+    if tables is None:
+        tables = _tables_evaluation[(etat.n_colonnes, etat.n_rangees)] = TablesEvaluation(etat.n_colonnes, etat.n_rangees)
+
+    x, o = etat.pions_x, etat.pions_o
+    occupees = x | o
+    deux_x, trois_x = tables.fenetres_ouvertes(x, o)
+    deux_o, trois_o = tables.fenetres_ouvertes(o, x)
+    menaces_x = tables.menaces(x, occupees)
+    menaces_o = tables.menaces(o, occupees)
+    impaires = tables.rangees_impaires
+    bonnes_x = (menaces_x & impaires).bit_count()
+    bonnes_o = (menaces_o & ~impaires).bit_count()
+
+    return (poids['deux'] * (deux_x - deux_o)
+            + poids['trois'] * (trois_x - trois_o)
+            + poids['menace_parite'] * (bonnes_x - bonnes_o)
+            + poids['menace'] * (menaces_x.bit_count() - bonnes_x - menaces_o.bit_count() + bonnes_o)
+            + poids['centre'] * ((x & tables.centre).bit_count() - (o & tables.centre).bit_count()))
+
+#####
+# Ordre des coups
+#
+# Alpha-beta coupe d'autant plus tôt que le meilleur coup est essayé en premier. Les coups sont
+# essayés dans cet ordre :
+#   1. le meilleur coup mémorisé dans la table de transposition ;
+#   2. les coups "killer" : deux coups qui ont provoqué une coupure au même nombre de pions joués ;
+#   3. les autres, par score d'historique décroissant (somme des profondeur² des coupures
+#      provoquées par ce coup, c.-à-d. ce pion sur cette case), puis du centre vers les bords.
+###
+NOMBRE_KILLERS = 2
+
+
+# Colonnes de la plus centrale à la plus excentrée
+def ordre_centre(n_colonnes):
+    return sorted(range(n_colonnes), key=lambda c: abs(2 * c - (n_colonnes - 1)))
+
+
+# Historique conservé d'un coup à l'autre, divisé par deux à chaque recherche pour oublier peu à peu
+_historique = None
+
+# Statistiques de la dernière recherche, pour mesurer l'efficacité de l'ordre des coups
+# (une bonne mise en ordre donne une coupure sur le premier coup dans plus de 90 % des cas) ;
+# 'bibliotheque' indique un coup lu dans la bibliothèque d'ouvertures, sans recherche
+statistiques = {}
+
+
+# Bit du bas de chaque colonne, utilisé par cle_position
+def bits_du_bas(etat):
+    return sum(1 << (c * (etat.n_rangees + 1)) for c in range(etat.n_colonnes))
+
+
+# Clé unique d'une position (voir plus haut)
+def cle_position(etat, bas):
+    courant = etat.pions_x if etat.n_coups % 2 == 0 else etat.pions_o
+    return courant + (etat.pions_x | etat.pions_o) + bas
+
+#####
+# Recherche
+###
+
+# Prépare une recherche alpha-beta sur une table de transposition
+# fct_but: Fonction but du jeu (voir joueur_connect4)
+# table: Table de transposition
+# historique: Scores d'historique des deux joueurs (voir "Ordre des coups")
+# limite: Séquence dont le premier élément est l'heure (time.time) à laquelle la recherche doit
+#         s'interrompre ; elle peut être avancée pendant la recherche (voir "Recherche parallèle")
+# stats: Dictionnaire où compter les noeuds et les coupures
+# Retourne les fonctions alpha_beta et approfondir
+def preparer_recherche(etat, fct_but, table, historique, limite, stats):
+    bas = bits_du_bas(etat)
+    h = etat.n_rangees + 1
+    killers = [[] for _ in range(etat.n_colonnes * etat.n_rangees + 1)]
+    rang_centre = {c: r for r, c in enumerate(ordre_centre(etat.n_colonnes))}
+
+    # Trie les coups possibles d'une position (voir "Ordre des coups")
+    def ordonner(etat_courant, actions, coup_memorise):
+        scores = historique[etat_courant.n_coups % 2]
+        hauteurs = etat_courant.hauteurs
+        killers_ici = killers[etat_courant.n_coups]
+        def priorite(action):
+            if action == coup_memorise:
+                return (0, 0, 0)
+            if action in killers_ici:
+                return (1, killers_ici.index(action), 0)
+            return (2, -scores[action * h + hauteurs[action]], rang_centre[action])
+        return sorted(actions, key=priorite)
+
+    # Met à jour les killers et l'historique après une coupure provoquée par une action
+    def coupure(etat_courant, profondeur, action, premier):
+        stats['coupures'] += 1
+        if premier:
+            stats['coupures_premier_coup'] += 1
+        historique[etat_courant.n_coups % 2][action * h + etat_courant.hauteurs[action]] += profondeur * profondeur
+        killers_ici = killers[etat_courant.n_coups]
+        if action not in killers_ici:
+            killers_ici.insert(0, action)
+            del killers_ici[NOMBRE_KILLERS:]
+
+    # Recherche alpha-beta avec la table de transposition : les bornes mémorisées resserrent la
+    # fenêtre (ou suffisent à conclure), et le meilleur coup mémorisé est essayé en premier
+    # Retourne (score, meilleur coup), ou None si le temps est écoulé
+    def alpha_beta(etat_courant, profondeur, alpha, beta, maximizing_player):
+        if time.time() > limite[0]:
             return None
+        stats['noeuds'] += 1
+
+        cle = cle_position(etat_courant, bas)
+        alpha_initial, beta_initial = alpha, beta
+        coup_memorise = None
+        entree = table.lire(cle)
+        if entree is not None:
+            profondeur_entree, score, type_score, coup_memorise = entree
+            if profondeur_entree >= profondeur:
+                if type_score == EXACT:
+                    return score, coup_memorise
+                if type_score == BORNE_INF:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    return score, coup_memorise
         
         resultat = fct_but(etat_courant)
         if resultat is not None or profondeur == 0:
             if resultat is None:
-                tableau = etat_courant.tableau
-                score = 0
-                
-                for i in range(etat_courant.n_rangees):
-                    for j in range(etat_courant.n_colonnes):
-                        if tableau[i, j] == 'X':
-                            score += 1
-                        elif tableau[i, j] == 'O':
-                            score -= 1
-                
-                return score
-            return resultat
-        
-        transitions = fct_transitions(etat_courant)
-        if not transitions:
-            return 0
+                return evaluer(etat_courant), None
+            return resultat, None
+
+        # Les coups sont joués puis annulés sur le même état, sans copie
+        actions = ordonner(etat_courant, etat_courant.coups_possibles(), coup_memorise)
         
+        meilleur_coup = None
         if maximizing_player:
             v = float('-inf')
-            for action, nouvel_etat in transitions.items():
-                valeur = alpha_beta(nouvel_etat, profondeur - 1, alpha, beta, False, temps_debut, temps_max)
+            for action in actions:
+                etat_courant.jouer(action)
+                valeur = alpha_beta(etat_courant, profondeur - 1, alpha, beta, False)
+                etat_courant.annuler()
                 if valeur is None:
                     return None
-                v = max(v, valeur)
+                if valeur[0] > v:
+                    v, meilleur_coup = valeur[0], action
                 alpha = max(alpha, v)
                 if beta <= alpha:
+                    coupure(etat_courant, profondeur, action, action == actions[0])
                     break
-            return v
         else:
             v = float('inf')
-            for action, nouvel_etat in transitions.items():
-                valeur = alpha_beta(nouvel_etat, profondeur - 1, alpha, beta, True, temps_debut, temps_max)
+            for action in actions:
+                etat_courant.jouer(action)
+                valeur = alpha_beta(etat_courant, profondeur - 1, alpha, beta, True)
+                etat_courant.annuler()
                 if valeur is None:
                     return None
-                v = min(v, valeur)
+                if valeur[0] < v:
+                    v, meilleur_coup = valeur[0], action
                 beta = min(beta, v)
                 if beta <= alpha:
+                    coupure(etat_courant, profondeur, action, action == actions[0])
                     break
-            return v
-    
-    transitions = fct_transitions(etat)
-    meilleure_action = None
-    meilleur_score = float('-inf') if str_joueur == 'X' else float('inf')
-    
-    for action, nouvel_etat in transitions.items():
-        if str_joueur == 'X':
-            score = alpha_beta(nouvel_etat, profondeur_max - 1, float('-inf'), float('inf'), False, temps_debut, int_tempsMaximal)
-            if score is None: 
+
+        if v <= alpha_initial:
+            type_score = BORNE_SUP
+        elif v >= beta_initial:
+            type_score = BORNE_INF
+        else:
+            type_score = EXACT
+        table.ecrire(cle, profondeur, v, type_score, meilleur_coup)
+        return v, meilleur_coup
+
+    # Recherche à la racine dans une fenêtre étroite autour du score précédent ; si le score
+    # sort de la fenêtre, on recommence avec la fenêtre ouverte de ce côté
+    def recherche_aspiration(etat_racine, profondeur, score_precedent):
+        alpha, beta = float('-inf'), float('inf')
+        if score_precedent is not None and abs(score_precedent) < SCORE_VICTOIRE:
+            alpha, beta = score_precedent - FENETRE_ASPIRATION, score_precedent + FENETRE_ASPIRATION
+        while True:
+            resultat = alpha_beta(etat_racine, profondeur, alpha, beta, etat_racine.n_coups % 2 == 0)
+            if resultat is None:
+                return None
+            if resultat[0] <= alpha:
+                alpha = float('-inf')
+            elif resultat[0] >= beta:
+                beta = float('inf')
+            else:
+                return resultat
+
+    # Approfondissement itératif, jusqu'à la fin de la partie au plus
+    # profondeur_initiale: Première profondeur cherchée
+    # Retourne le meilleur coup de la dernière profondeur terminée (None si aucune)
+    def approfondir(etat_racine, profondeur_initiale=1):
+        meilleure_action = None
+        score = None
+        durees = []
+        cases_vides = etat_racine.n_colonnes * etat_racine.n_rangees - etat_racine.n_coups
+        profondeur_max = cases_vides if PROFONDEUR_MAX is None else min(cases_vides, PROFONDEUR_MAX)
+        for profondeur in range(min(profondeur_initiale, profondeur_max), profondeur_max + 1):
+            debut_iteration = time.time()
+            resultat = recherche_aspiration(etat_racine, profondeur, score)
+            if resultat is None:
                 break
-            if score > meilleur_score:
-                meilleur_score = score
+            score, action = resultat
+            if action is not None:
                 meilleure_action = action
-        else: 
-            score = alpha_beta(nouvel_etat, profondeur_max - 1, float('-inf'), float('inf'), True, temps_debut, int_tempsMaximal)
-            if score is None:
+            durees.append(time.time() - debut_iteration)
+            stats['profondeur'] = profondeur
+
+            # Partie gagnée ou perdue à coup sûr : chercher plus loin ne changera rien
+            if abs(score) >= SCORE_VICTOIRE or not iteration_possible(durees, limite[0]):
                 break
-            if score < meilleur_score:
-                meilleur_score = score
-                meilleure_action = action
-        
-        if time.time() - temps_debut > int_tempsMaximal * 0.9:
+        return meilleure_action
+
+    return alpha_beta, approfondir
+
+
+#####
+# Recherche parallèle
+#
+# Avec PROCESSUS > 1, des processus auxiliaires sont créés au premier coup (par fork, ce qui
+# évite d'avoir à importer ce module dans les processus fils) et conservés toute la partie.
+# Deux modes :
+#   - 'racine' : à chaque profondeur, le premier coup de la racine (le meilleur de la profondeur
+#     précédente) est cherché seul, puis les autres sont répartis entre les processus, qui les
+#     cherchent avec son score pour borne et leur propre table de transposition. Un coup dont le
+#     score dépasse la borne est exact (la fenêtre est ouverte de ce côté) : pas de seconde
+#     recherche. Simple et prévisible, mais les coups ne partagent pas leurs tables.
+#   - 'lazy_smp' : tous les processus cherchent la racine entière, avec des profondeurs de
+#     départ décalées, en partageant la même table de transposition en mémoire partagée ;
+#     chacun profite des positions déjà résolues par les autres. Seul le résultat du
+#     processus principal est utilisé.
+# Tous respectent la même échéance que la recherche séquentielle. Elle est placée, avec le numéro
+# de la recherche en cours, dans un bloc de contrôle en mémoire partagée : le processus principal
+# arrête les auxiliaires dès qu'il a fini (en avançant l'échéance), et les tâches d'une recherche
+# terminée qui restent dans la file sont ignorées.
+#
+# Mémoire : en mode 'racine', le processus principal ne cherche pas et n'a pas de table ; les
+# PROCESSUS auxiliaires ont chacun leur table de TAILLE_TABLE_AUXILIAIRE_MO Mo (4 x 16 = 64 Mo
+# pour 4 processus). En mode 'lazy_smp', la seule table, partagée, occupe TAILLE_TABLE_MO Mo.
+#
+# Sans fork (Windows), la recherche reste séquentielle : PROCESSUS est ramené à 1 au premier coup.
+###
+PROCESSUS = 1
+MODE_PARALLELE = 'racine'
+TAILLE_TABLE_AUXILIAIRE_MO = 16
+
+# Processus auxiliaires, files de tâches et de résultats et bloc de contrôle
+# (échéance, numéro de la recherche en cours)
+_auxiliaires = None
+
+# Génération des tables des auxiliaires en mode 'racine', faute de table dans le processus principal
+_generation = 0
+
+
+# Boucle d'un processus auxiliaire
+# Tâches : ('racine', numero, (coup, alpha, beta), etat, profondeur, generation) -> (numero, coup, score, statistiques)
+#          ('lazy_smp', numero, None, etat, profondeur initiale, generation) -> rien
+def _boucle_auxiliaire(taches, resultats, controle, fct_but, table):
+    if table is None:
+        table = TableTransposition(TAILLE_TABLE_AUXILIAIRE_MO)
+    historique = None
+    while True:
+        tache = taches.get()
+        if tache is None:
+            return
+        genre, numero, coup, etat, profondeur, generation = tache
+        if numero != controle[1]:
+            continue
+        if historique is None:
+            historique = [[0] * (etat.n_colonnes * (etat.n_rangees + 1)) for _ in range(2)]
+        table.generation = generation
+        stats = {'noeuds': 0, 'coupures': 0, 'coupures_premier_coup': 0, 'profondeur': 0}
+        alpha_beta, approfondir = preparer_recherche(etat, fct_but, table, historique, controle, stats)
+        if genre == 'racine':
+            coup, alpha, beta = coup
+            valeur = alpha_beta(etat, profondeur, alpha, beta, etat.n_coups % 2 == 0)
+            resultats.put((numero, coup, None if valeur is None else valeur[0], stats))
+        else:
+            approfondir(etat, profondeur)
+
+
+# Démarre les processus auxiliaires (une seule fois par partie)
+def _demarrer_auxiliaires(fct_but, table):
+    global _auxiliaires
+    if _auxiliaires is None:
+        contexte = multiprocessing.get_context('fork')
+        taches, resultats = contexte.Queue(), contexte.Queue()
+        controle = contexte.RawArray('d', 2)
+        partagee = table if MODE_PARALLELE == 'lazy_smp' else None
+        processus = [contexte.Process(target=_boucle_auxiliaire,
+                                      args=(taches, resultats, controle, fct_but, partagee), daemon=True)
+                     for _ in range(PROCESSUS - (MODE_PARALLELE == 'lazy_smp'))]
+        for p in processus:
+            p.start()
+        _auxiliaires = (processus, taches, resultats, controle)
+    return _auxiliaires
+
+
+# Arrête les processus auxiliaires et oublie les tables (pour changer de mode ou de nombre
+# de processus, par exemple dans un benchmark)
+def arreter_auxiliaires():
+    global _auxiliaires, _table, _historique, _generation
+    if _auxiliaires is not None:
+        processus, taches, resultats, controle = _auxiliaires
+        controle[0] = 0.0
+        for _ in processus:
+            taches.put(None)
+        for p in processus:
+            p.join(1)
+            if p.is_alive():
+                p.terminate()
+    _auxiliaires = None
+    _table = None
+    _historique = None
+    _generation = 0
+
+
+# Approfondissement itératif avec répartition des coups de la racine entre les processus
+# Retourne le meilleur coup de la dernière profondeur terminée (None si aucune)
+def recherche_racine_parallele(etat, fct_but, generation, echeance, stats):
+    processus, taches, resultats, controle = _demarrer_auxiliaires(fct_but, None)
+    maximiser = etat.n_coups % 2 == 0
+    coups = sorted(etat.coups_possibles(), key=ordre_centre(etat.n_colonnes).index)
+
+    # Cherche des coups de la racine en parallèle
+    # Retourne un dictionnaire coup -> score, ou None si le temps est écoulé
+    def chercher(coups_a_chercher, profondeur, alpha, beta):
+        for coup in coups_a_chercher:
+            etat.jouer(coup)
+            taches.put(('racine', controle[1], (coup, alpha, beta), etat.copie(), profondeur - 1, generation))
+            etat.annuler()
+
+        # Les résultats d'une recherche abandonnée peuvent encore arriver : on les ignore
+        scores = {}
+        while len(scores) < len(coups_a_chercher):
+            try:
+                numero, coup, score, stats_auxiliaire = resultats.get(timeout=max(0.0, echeance - time.time()) + 1.0)
+            except Exception:
+                return None
+            if numero != controle[1]:
+                continue
+            # Les compteurs des auxiliaires s'ajoutent à ceux du coup ; la profondeur est celle de la racine
+            for cle, valeur in stats_auxiliaire.items():
+                if cle != 'profondeur':
+                    stats[cle] += valeur
+            if score is None:
+                return None
+            scores[coup] = score
+        return scores
+
+    meilleure_action = None
+    durees = []
+    cases_vides = etat.n_colonnes * etat.n_rangees - etat.n_coups
+    profondeur_max = cases_vides if PROFONDEUR_MAX is None else min(cases_vides, PROFONDEUR_MAX)
+    for profondeur in range(1, profondeur_max + 1):
+        debut_iteration = time.time()
+        controle[1] += 1
+        scores = chercher(coups[:1], profondeur, float('-inf'), float('inf'))
+        if scores is not None and len(coups) > 1:
+            borne = scores[coups[0]]
+            if maximiser:
+                autres = chercher(coups[1:], profondeur, borne, float('inf'))
+            else:
+                autres = chercher(coups[1:], profondeur, float('-inf'), borne)
+            scores = None if autres is None else {**scores, **autres}
+        if scores is None:
             break
+
+        # Les coups sont triés du meilleur au moins bon pour la profondeur suivante
+        coups.sort(key=lambda c: -scores[c] if maximiser else scores[c])
+        meilleure_action = coups[0]
+        durees.append(time.time() - debut_iteration)
+        stats['profondeur'] = profondeur
+        if abs(scores[coups[0]]) >= SCORE_VICTOIRE or not iteration_possible(durees, echeance):
+            break
+    return meilleure_action
+
+#####
+# Bibliothèque d'ouvertures
+#
+# Les premiers coups d'une partie mènent toujours aux mêmes positions : elles sont cherchées à
+# l'avance (voir bibliotheque_connect4.py) et leur meilleur coup est enregistré dans un fichier
+# binaire. Le fichier commence par un en-tête (format, dimensions du plateau, nombre d'entrées)
+# suivi d'entrées de taille fixe (clé de la position, score, coup, profondeur de recherche)
+# triées par clé. Il est projeté en mémoire (mmap) et consulté par recherche dichotomique :
+# l'ouvrir ne coûte presque rien et une consultation prend quelques microsecondes.
+#
+# Une position et son image miroir ont le même score et des coups miroirs : seule la position de
+# plus petite clé est enregistrée.
+#
+# Une entrée n'est utile que si elle a été cherchée plus profondément que la recherche ne le
+# ferait pendant le temps alloué. Sauf pour une position résolue (PROFONDEUR_RESOLUE : partie
+# gagnée ou perdue à coup sûr, ou cherchée jusqu'à la fin), une courte recherche, sur
+# PART_SONDAGE du temps, mesure la profondeur atteinte ; la profondeur atteignable avec tout le
+# temps en est déduite (chaque profondeur coûtant au moins BRANCHEMENT_MIN fois la précédente).
+# Si l'entrée n'est pas plus profonde, la recherche continue normalement, sa table déjà remplie.
+# Les entrées de profondeur 0 (fichiers écrits avant l'ajout de la profondeur) ne servent jamais.
+###
+FICHIER_BIBLIOTHEQUE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bibliotheque_connect4.bin')
+UTILISER_BIBLIOTHEQUE = True
+
+FORMAT_BIBLIOTHEQUE = b'C4BO'
+ENTETE_BIBLIOTHEQUE = struct.Struct('<4sHHI')       # Format, colonnes, rangées, nombre d'entrées
+ENTREE_BIBLIOTHEQUE = struct.Struct('<QibB2x')      # Clé, score, coup, profondeur (16 octets)
+PROFONDEUR_RESOLUE = 255
+PART_SONDAGE = 0.1
+
+
+# Image miroir (gauche-droite) d'un bitboard
+def miroir(pions, n_colonnes, n_rangees):
+    h = n_rangees + 1
+    colonne = (1 << h) - 1
+    return sum(((pions >> (c * h)) & colonne) << ((n_colonnes - 1 - c) * h) for c in range(n_colonnes))
+
+
+# Clé de la position ou de son image miroir, la plus petite des deux
+# Retourne (clé, vrai si c'est la clé du miroir)
+def cle_canonique(etat, bas):
+    cle = cle_position(etat, bas)
+    courant = etat.pions_x if etat.n_coups % 2 == 0 else etat.pions_o
+    occupees = etat.pions_x | etat.pions_o
+    cle_miroir = (miroir(courant, etat.n_colonnes, etat.n_rangees)
+                  + miroir(occupees, etat.n_colonnes, etat.n_rangees) + bas)
+    return (cle_miroir, True) if cle_miroir < cle else (cle, False)
+
+
+# Enregistre une bibliothèque
+# entrees: Dictionnaire clé canonique -> (score, coup, profondeur)
+def ecrire_bibliotheque(chemin, entrees, n_colonnes, n_rangees):
+    with open(chemin, 'wb') as fichier:
+        fichier.write(ENTETE_BIBLIOTHEQUE.pack(FORMAT_BIBLIOTHEQUE, n_colonnes, n_rangees, len(entrees)))
+        for cle in sorted(entrees):
+            score, coup, profondeur = entrees[cle]
+            fichier.write(ENTREE_BIBLIOTHEQUE.pack(cle, score, coup, min(profondeur, PROFONDEUR_RESOLUE)))
+
+
+class Bibliotheque:
+    def __init__(self, chemin):
+        with open(chemin, 'rb') as fichier:
+            self.donnees = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        format_fichier, self.n_colonnes, self.n_rangees, self.taille = ENTETE_BIBLIOTHEQUE.unpack_from(self.donnees)
+        if format_fichier != FORMAT_BIBLIOTHEQUE:
+            raise ValueError("{0} n'est pas une bibliothèque d'ouvertures".format(chemin))
+
+    # Retourne (coup, score, profondeur) pour une position, ou None si elle n'est pas dans la bibliothèque
+    def chercher(self, etat):
+        if (etat.n_colonnes, etat.n_rangees) != (self.n_colonnes, self.n_rangees):
+            return None
+        cle, est_miroir = cle_canonique(etat, bits_du_bas(etat))
+        debut, fin = 0, self.taille
+        while debut < fin:
+            milieu = (debut + fin) // 2
+            cle_milieu, score, coup, profondeur = ENTREE_BIBLIOTHEQUE.unpack_from(
+                self.donnees, ENTETE_BIBLIOTHEQUE.size + milieu * ENTREE_BIBLIOTHEQUE.size)
+            if cle_milieu < cle:
+                debut = milieu + 1
+            elif cle_milieu > cle:
+                fin = milieu
+            else:
+                return (self.n_colonnes - 1 - coup if est_miroir else coup), score, profondeur
+        return None
+
+
+# Bibliothèque ouverte au premier coup (False si le fichier est absent)
+_bibliotheque = None
+
+
+def consulter_bibliotheque(etat):
+    global _bibliotheque
+    if not UTILISER_BIBLIOTHEQUE:
+        return None
+    if _bibliotheque is None:
+        _bibliotheque = Bibliotheque(FICHIER_BIBLIOTHEQUE) if os.path.isfile(FICHIER_BIBLIOTHEQUE) else False
+    if _bibliotheque is False:
+        return None
+    return _bibliotheque.chercher(etat)
+
+######################
+# Solution Connect 4 #
+######################
+
+#####
+# joueur_connect4 : Fonction qui calcule le prochain coup optimal pour gagner la
+#                   la partie de Connect4 à l'aide d'Alpha-Beta Prunning.
+#
+# etat: Objet de la classe Connect4Etat indiquant l'état actuel du jeu.
+#
+# fct_but: Fonction qui prend en entrée un objet de la classe Connect4Etat et
+#          qui retourne le score actuel tu plateau. Si le score est positif, les 'X' ont l'avantage
+#          si c'est négatif ce sont les 'O' qui ont l'avantage, si c'est 0 la partie est nulle.
+#
+# fct_transitions: Fonction qui prend en entrée un objet de la classe Connect4Etat et 
+#                   qui retourne une liste de tuples actions-états voisins pour l'état donné.
+#
+# str_joueur: String indiquant c'est à qui de jouer : les 'X' ou 'O'.
+#
+# int_tempsMaximal: Entier indiquant le temps, en secondes, alloué pour prendre une décision.
+#
+# retour: Cette fonction retourne l'action optimal à joeur pour le joueur actuel c.-à-d. 'str_joueur'.
+###  
+def joueur_connect4(etat, fct_but, fct_transitions, str_joueur, int_tempsMaximal):
+    global _table, _historique, _generation, PROCESSUS
     
+    temps_debut = time.time()
+    echeance = temps_debut + int_tempsMaximal * MARGE_TEMPS
+
+    if PROCESSUS > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        PROCESSUS = 1
+
+    statistiques.clear()
+    statistiques.update({'noeuds': 0, 'coupures': 0, 'coupures_premier_coup': 0, 'profondeur': 0,
+                         'bibliotheque': False})
+
+    # Position résolue dans la bibliothèque d'ouvertures : réponse immédiate
+    ouverture = consulter_bibliotheque(etat)
+    if ouverture is not None and ouverture[2] == PROFONDEUR_RESOLUE:
+        statistiques['bibliotheque'] = True
+        return ouverture[0]
+
+    if PROCESSUS > 1 and MODE_PARALLELE == 'racine':
+        _generation = (_generation + 1) & 0x3FF
+        processus, taches, _, controle = _demarrer_auxiliaires(fct_but, None)
+    else:
+        if _table is None:
+            _table = TableTransposition(partagee=PROCESSUS > 1)
+        table = _table
+        table.nouvelle_recherche()
+
+        if _historique is None:
+            _historique = [[0] * (etat.n_colonnes * (etat.n_rangees + 1)) for _ in range(2)]
+        for scores in _historique:
+            for i in range(len(scores)):
+                scores[i] >>= 1
+
+        if PROCESSUS > 1:
+            processus, taches, _, controle = _demarrer_auxiliaires(fct_but, table)
+
+    # Recherche jusqu'à une échéance ; les tables gardent ses résultats pour la suivante
+    # Retourne le meilleur coup de la dernière profondeur terminée (None si aucune)
+    def rechercher(echeance_recherche):
+        if PROCESSUS > 1:
+            controle[0] = echeance_recherche
+        if PROCESSUS > 1 and MODE_PARALLELE == 'racine':
+            action = recherche_racine_parallele(etat, fct_but, _generation, echeance_recherche, statistiques)
+        else:
+            if PROCESSUS > 1:
+                # Les auxiliaires commencent une ou deux profondeurs plus loin pour ne pas
+                # suivre exactement le même chemin que le processus principal
+                controle[1] += 1
+                for k in range(len(processus)):
+                    taches.put(('lazy_smp', controle[1], None, etat.copie(), 2 + k % 2, table.generation))
+            _, approfondir = preparer_recherche(etat, fct_but, table, _historique, [echeance_recherche],
+                                                statistiques)
+            action = approfondir(etat)
+
+        # Les auxiliaires s'arrêtent dès que la recherche est finie
+        if PROCESSUS > 1:
+            controle[0] = 0.0
+        return action
+
+    meilleure_action = None
+    if ouverture is not None:
+        # Profondeur que la recherche atteindrait avec tout le temps alloué, d'après une
+        # recherche courte (voir "Bibliothèque d'ouvertures")
+        debut_sondage = time.time()
+        meilleure_action = rechercher(debut_sondage + (echeance - debut_sondage) * PART_SONDAGE)
+        duree = time.time() - debut_sondage
+        profondeur_atteignable = math.inf
+        if duree > 0 and meilleure_action is not None:
+            restant = max(echeance - time.time(), 0.0)
+            profondeur_atteignable = (statistiques['profondeur']
+                                      + math.log(1 + restant / duree) / math.log(BRANCHEMENT_MIN))
+        if ouverture[2] > profondeur_atteignable:
+            statistiques['bibliotheque'] = True
+            return ouverture[0]
+
+    action = rechercher(echeance)
+    if action is not None:
+        meilleure_action = action
+
     if meilleure_action is None:
-        items_list = list(transitions.items())
-        meilleure_action, _ = random.choice(items_list)
+        meilleure_action = random.choice(list(etat.coups_possibles()))
     
     return meilleure_action
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import json
+import argparse
+import platform
+import numpy as np
+
+from plan_table import (MODES, Etat, Trace, table_rectangulaire, contraintes_aleatoires,
+                        redemarrages, recherche_exacte)
+
+###################################################
+################### Benchmark #####################
+###################################################
+
+# Nombre maximal d'invités pour lequel la recherche exacte est comparée
+TAILLE_MAX_EXACTE = 20
+
+# Budget de chaque essai des redémarrages aléatoires, en secondes : chaque processus enchaîne
+# jusqu'à budget / DUREE_ESSAI essais (moins si le budget est épuisé avant)
+DUREE_ESSAI = 0.02
+
+# Fonction pour comparer les recherches sur une instance
+# Toutes les recherches locales partent du même placement aléatoire, avec chacun des budgets ;
+# les redémarrages aléatoires et la recherche exacte (jusqu'à TAILLE_MAX_EXACTE invités)
+# reçoivent les mêmes budgets
+# contraintes: Matrice de contraintes
+# modes: Noms des recherches à comparer (voir MODES)
+# budgets: Temps maximaux en secondes
+# graine: Graine du placement de départ et des recherches
+# modes_redemarrages: Recherches lancées en redémarrages aléatoires parallèles
+# processus: Nombre de processus des redémarrages (par défaut, un par cœur)
+# Retourne une liste de résultats (recherche, budget, nombre d'insatisfaits, trace) ;
+# les redémarrages et la recherche exacte n'ont pas de trace, seulement leur temps
+def comparer(contraintes:np.ndarray, modes:list[str], budgets:list[float], graine:int=0,
+             modes_redemarrages:list[str]=[], processus:int|None=None) -> list[dict]:
+    n = len(contraintes)
+    disposition = table_rectangulaire(n // 2)
+    depart = Etat(contraintes, disposition)
+    depart.melanger(graine)
+    resultats = []
+    for mode in modes:
+        for budget in budgets:
+            trace = Trace()
+            etat = MODES[mode](depart.copie(), budget, graine, trace=trace)
+            resultats.append(dict({
+                'mode': mode,
+                'budget': budget,
+                'depart': depart.nb_insatisfaits(),
+                'insatisfaits': etat.nb_insatisfaits(),
+                'optimal': None,
+            }, **trace.resume()))
+
+    sans_trace = dict(Trace().resume(), evaluations=None, iterations=None, ameliorations=None)
+    if processus is None:
+        processus = os.cpu_count() or 1
+    for mode in modes_redemarrages:
+        for budget in budgets:
+            debut = time.perf_counter()
+            essais = processus * max(1, round(budget / DUREE_ESSAI))
+            etat = redemarrages(mode, essais, processus, budget, graine, contraintes, disposition)
+            resultats.append(dict(sans_trace, **{
+                'mode': 'redemarrages-' + mode,
+                'budget': budget,
+                'depart': None,
+                'insatisfaits': etat.nb_insatisfaits(),
+                'optimal': None,
+                'temps': time.perf_counter() - debut,
+            }))
+
+    if n <= TAILLE_MAX_EXACTE:
+        for budget in budgets:
+            etat, stats = recherche_exacte(contraintes, disposition, budget, graine=graine)
+            resultats.append(dict(sans_trace, **{
+                'mode': 'exacte',
+                'budget': budget,
+                'depart': None,
+                'insatisfaits': etat.nb_insatisfaits(),
+                'optimal': stats['optimal'],
+                'temps': stats['temps'],
+                'noeuds': stats['noeuds'],
+            }))
+    return resultats
+
+# Fonction pour afficher les résultats d'une instance sous forme de tableau
+# La colonne optimum indique si la recherche exacte a prouvé l'optimalité de son plan
+def afficher(titre:str, resultats:list[dict]):
+    print(titre)
+    print('  {0:<22} {1:>8} {2:>13} {3:>8} {4:>10} {5:>10} {6:>14}'.format(
+        'recherche', 'budget', 'insatisfaits', 'optimum', 'temps (s)', 'itérations', 'évaluations/s'))
+    for r in resultats:
+        vitesse = '-' if r['evaluations_par_seconde'] is None else '{0:.0f}'.format(r['evaluations_par_seconde'])
+        iterations = '-' if r['iterations'] is None else r['iterations']
+        optimum = '-' if r['optimal'] is None else ('oui' if r['optimal'] else 'non')
+        print('  {0:<22} {1:>8} {2:>13} {3:>8} {4:>10.3f} {5:>10} {6:>14}'.format(
+            r['mode'], r['budget'], r['insatisfaits'], optimum, r['temps'], iterations, vitesse))
+
+#########################################
+########### Exécution du code ###########
+#########################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison des recherches de plan de table.")
+    parser.add_argument('--tailles', nargs='+', type=int, default=[12, 50, 200],
+                        help="nombres d'invités (pairs) des instances générées")
+    parser.add_argument('--densites', nargs='+', type=float, default=[0.05, 0.2],
+                        help="proportions de paires d'invités avec une contrainte")
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=sorted(MODES),
+                        help="recherches à comparer")
+    parser.add_argument('--redemarrages', nargs='*', choices=sorted(MODES), default=sorted(MODES),
+                        help="recherches à comparer aussi en redémarrages aléatoires parallèles")
+    parser.add_argument('--processus', type=int, default=None,
+                        help="nombre de processus des redémarrages (par défaut, un par cœur)")
+    parser.add_argument('--budgets', nargs='+', type=float, default=[0.1, 1.0],
+                        help="temps maximaux de chaque recherche, en secondes")
+    parser.add_argument('--graine', type=int, default=0,
+                        help="graine des instances et des recherches")
+    parser.add_argument('--json', metavar='FICHIER', default=None,
+                        help="fichier JSON où enregistrer les résultats et les traces")
+    args = parser.parse_args()
+
+    enregistrements = []
+    for n in args.tailles:
+        for densite in args.densites:
+            contraintes = contraintes_aleatoires(n, densite, args.graine)
+            resultats = comparer(contraintes, args.modes, args.budgets, args.graine,
+                                 args.redemarrages, args.processus)
+            afficher('{0} invités, densité {1}, graine {2}'.format(n, densite, args.graine), resultats)
+            enregistrements.extend(dict({'invites': n, 'densite': densite, 'graine': args.graine}, **r)
+                                   for r in resultats)
+
+    if args.json is not None:
+        with open(args.json, 'w') as fichier:
+            json.dump({
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'resultats': enregistrements,
+            }, fichier, indent=4)
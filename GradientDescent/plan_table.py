@@ -1,6 +1,13 @@
 from __future__ import annotations
-import csv
-import copy
+import os
+import sys
+import math
+import time
+import random
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 ###################################################
 ################## Utilitaires ####################
@@ -22,16 +29,146 @@ def char_range(c1:str, c2:str):
     for c in range(ord(c1), ord(c2)+1):
         yield chr(c)
 
+############################################
+############### Contraintes ################
+############################################
+# Fichier de contraintes par défaut, à côté de ce script
+FICHIER_CONTRAINTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contraintes.csv")
+
+# Matrices de contraintes déjà lues, partagées par tous les états
+_contraintes_chargees = {}
+
+# Fonction pour charger une matrice de contraintes
+# Le fichier n'est lu qu'une seule fois : les appels suivants renvoient la même matrice,
+# en lecture seule pour pouvoir être partagée sans copie entre tous les états
+# chemin: Fichier CSV des contraintes
+# Retourne la matrice des contraintes (entiers sur 8 bits)
+def charger_contraintes(chemin:str=FICHIER_CONTRAINTES) -> np.ndarray:
+    if chemin not in _contraintes_chargees:
+        contraintes = np.loadtxt(chemin, delimiter=',', dtype=np.int8, ndmin=2)
+        contraintes.setflags(write=False)
+        _contraintes_chargees[chemin] = contraintes
+    return _contraintes_chargees[chemin]
+
+# Fonction pour générer une matrice de contraintes aléatoire
+# n: Nombre d'invités
+# densite: Proportion des paires (g, h) pour lesquelles g exprime une contrainte envers h
+# graine: Graine du générateur aléatoire
+# Retourne une matrice n x n d'entiers dans {-1, 0, 1}, de diagonale nulle
+def contraintes_aleatoires(n:int, densite:float, graine:int=0) -> np.ndarray:
+    alea = np.random.default_rng(graine)
+    contraintes = np.where(alea.random((n, n)) < densite, alea.choice([-1, 1], size=(n, n)), 0)
+    np.fill_diagonal(contraintes, 0)
+    return contraintes.astype(np.int8)
+
+############################################
+############ Dispositions de tables ########
+############################################
+# Classe décrivant les places disponibles et leurs voisinages
+# Deux places sont voisines si les invités qui y sont assis peuvent se parler
+# (côte à côte ou face à face) ; les places sont numérotées de 0 à n_places-1.
+class Disposition:
+    # adjacence: Matrice booléenne symétrique n_places x n_places des places voisines
+    # tables: Liste des tables pour l'affichage, chacune sous la forme (forme, rangées de places)
+    # symetries: Permutations des places qui conservent le voisinage (miroir, retournement...) ;
+    #            il suffit de donner des générateurs du groupe des symétries
+    def __init__(self, adjacence:np.ndarray, tables:list[tuple[str, list[list[int]]]],
+                 symetries:list[list[int]]=[]):
+        self.adjacence = np.array(adjacence, dtype=bool)
+        self.adjacence.setflags(write=False)
+        self.tables = tables
+        self.symetries = symetries
+        self.n_places = len(self.adjacence)
+        # Ensembles de voisines, pour tester une paire de places sans passer par NumPy
+        self.voisinage = [frozenset(np.flatnonzero(ligne).tolist()) for ligne in self.adjacence]
+
+    # Fonction pour calculer les orbites des places sous l'action des symétries
+    # Deux places de la même orbite sont interchangeables : un plan où un invité est assis à
+    # l'une se transforme, par symétrie, en un plan équivalent où il est assis à l'autre
+    # Retourne, pour chaque place, la plus petite place de son orbite
+    def representants(self) -> list[int]:
+        representant = list(range(self.n_places))
+        def racine(p):
+            while representant[p] != p:
+                p = representant[p]
+            return p
+        for permutation in self.symetries:
+            for p, q in enumerate(permutation):
+                a, b = racine(p), racine(q)
+                if a != b:
+                    representant[max(a, b)] = min(a, b)
+        return [racine(p) for p in range(self.n_places)]
+
+# Fonction pour créer une table rectangulaire
+# Les places 0 à n-1 forment un côté, les places n à 2n-1 le côté d'en face
+# n_par_cote: Nombre de places de chaque côté
+# Retourne la disposition correspondante
+def table_rectangulaire(n_par_cote:int) -> Disposition:
+    n = 2*n_par_cote
+    adjacence = np.zeros((n, n), dtype=bool)
+    for p in range(n):
+        rangee, colonne = divmod(p, n_par_cote)
+        if colonne > 0:             adjacence[p, p-1] = True                        # Côte à côte
+        if colonne < n_par_cote-1:  adjacence[p, p+1] = True
+        adjacence[p, (1-rangee)*n_par_cote + colonne] = True                        # Face à face
+    # Symétries : miroir (gauche-droite) et retournement (un côté avec l'autre)
+    miroir = [(p // n_par_cote)*n_par_cote + n_par_cote-1 - p % n_par_cote for p in range(n)]
+    retournement = [(p + n_par_cote) % n for p in range(n)]
+    return Disposition(adjacence, [('rectangulaire', [list(range(n_par_cote)), list(range(n_par_cote, n))])],
+                       [miroir, retournement])
+
+# Fonction pour créer une table ronde
+# Chaque place a pour voisines les deux places qui l'entourent
+# n: Nombre de places
+# Retourne la disposition correspondante
+def table_ronde(n:int) -> Disposition:
+    adjacence = np.zeros((n, n), dtype=bool)
+    for p in range(n):
+        adjacence[p, (p+1) % n] = adjacence[(p+1) % n, p] = (n > 1)
+    # Symétries : rotation d'une place et miroir
+    rotation = [(p+1) % n for p in range(n)]
+    miroir = [(n-p) % n for p in range(n)]
+    return Disposition(adjacence, [('ronde', [list(range(n))])], [rotation, miroir])
+
+# Fonction pour réunir plusieurs tables dans une même salle
+# Les places sont renumérotées à la suite ; deux places de tables différentes ne sont jamais voisines
+# dispositions: Tables à réunir
+# Retourne la disposition correspondante
+def plusieurs_tables(*dispositions:Disposition) -> Disposition:
+    n = sum(d.n_places for d in dispositions)
+    adjacence = np.zeros((n, n), dtype=bool)
+    tables = []
+    symetries = []
+    debut = 0
+    for d in dispositions:
+        fin = debut + d.n_places
+        adjacence[debut:fin, debut:fin] = d.adjacence
+        for forme, rangees in d.tables:
+            tables.append((forme, [[debut + p for p in rangee] for rangee in rangees]))
+        # Chaque symétrie d'une table laisse les autres tables en place
+        for permutation in d.symetries:
+            symetries.append(list(range(debut)) + [debut + q for q in permutation] + list(range(fin, n)))
+        debut = fin
+    return Disposition(adjacence, tables, symetries)
+
+# Fonction pour nommer les invités
+# Lettres de A à Z tant qu'il y a assez de lettres, numéros sinon
+# n: Nombre d'invités
+# Retourne la liste des noms
+def noms_invites(n:int) -> list[str]:
+    if n <= 26:
+        return list(char_range('A', chr(64+n)))
+    return [str(g) for g in range(n)]
+
 ############################################
 ############### Classe Etat ################
 ############################################
 # Classe représentant les états possibles de la table
 class Etat:
     # Fonction d'initialisation, appelée à la construction d'un objet Etat
-    def __init__(self):
-        # On place les invités dans un certain ordre, sans prise en compte des contraintes
-        self.table = [  ['A','B','C','D','E','F'],
-                        ['G','H','I','J','K','L']]
+    # contraintes: Matrice de contraintes partagée (par défaut, celle de contraintes.csv)
+    # disposition: Disposition des places (par défaut, une table rectangulaire à deux côtés)
+    def __init__(self, contraintes:np.ndarray|None=None, disposition:Disposition|None=None):
         # Récupération du tableau de contraintes
         # Dans le fichier CSV: 
         # * 1 en ligne i, colonne j signifie que i veut être à côté (ou en face) de j
@@ -51,119 +188,788 @@ class Etat:
         # - J veut juste rester proche de C
         # - K demande une place à côté de B
         # - L en veut à F
-        self.contraintes=[]
-        # @TODO: Changer le chemin vers le fichier CSV si besoin
-        with open("./contraintes.csv",newline='') as gridfile:
-            reader = csv.reader(gridfile, delimiter=',',quoting=csv.QUOTE_NONNUMERIC)
-            for row in reader:
-                self.contraintes.append(row)
-        
+        self.contraintes = contraintes if contraintes is not None else charger_contraintes()
+        n = len(self.contraintes)
+        self.disposition = disposition if disposition is not None else table_rectangulaire(n//2)
+        if self.disposition.n_places != n:
+            raise ValueError("{0} places pour {1} invités".format(self.disposition.n_places, n))
+        self.noms = noms_invites(n)
+
+        # On place les invités dans un certain ordre, sans prise en compte des contraintes
+        # * places[p] est le numéro de l'invité assis à la place p (A=0, B=1, ...)
+        # * position[g] est le numéro de la place de l'invité g
+        self.places = list(range(n))
+        self.position = list(range(n))
+
+        # Masques des contraintes pour l'évaluation vectorisée
+        self.veut = self.contraintes == 1
+        self.refuse = self.contraintes == -1
+        # Contraintes exprimées, sous forme de couples (invité, invité concerné)
+        self.paires_contraintes = np.nonzero(self.veut | self.refuse)
+
+        # Index des contraintes, partagés par toutes les copies de l'état
+        # * exigences[g]: liste des (invité, contrainte) exprimées par g
+        # * concernes[g]: invités ayant exprimé une contrainte au sujet de g
+        exprimees = self.veut | self.refuse
+        self.exigences = [[(j, int(self.contraintes[g, j])) for j in np.flatnonzero(exprimees[g]).tolist()]
+                          for g in range(n)]
+        self.concernes = [np.flatnonzero(exprimees[:, g]).tolist() for g in range(n)]
+
+    # Fonction pour copier un état
+    # La matrice et les index de contraintes, et la disposition, sont partagés :
+    # seul le placement est copié
+    # self: Etat courant
+    # Retourne un nouvel état identique
+    def copie(self)->Etat:
+        copie = Etat.__new__(Etat)
+        copie.__dict__.update(self.__dict__)
+        copie.places = self.places[:]
+        copie.position = self.position[:]
+        return copie
+
     # Fonction pour copier un état et échanger deux places
     # self: Etat courant
     # i,j: Numéros de places à échanger
     # Retourne l'état avec les places échangées
     def copie_avec_echange(self,i:int,j:int)->Etat:
-        copie = Etat()
-        copie.table = copy.deepcopy(self.table)
+        copie = self.copie()
         copie.echanger(i,j)
-        copie.contraintes=self.contraintes
 
         return copie
 
+    # Vue de la table sous forme de rangées de noms (toutes tables confondues)
+    @property
+    def table(self) -> list[list[str]]:
+        return [[self.noms[self.places[p]] for p in rangee]
+                for _, rangees in self.disposition.tables for rangee in rangees]
+
     # Fonction pour tester si deux personnes sont voisines
     # self: Etat courant
     # i,j: Personnes à vérifier
     # Retourne True si les personnes sont côte à côte ou face à face
     def voisins(self,i:str,j:str) -> bool:
-        place_i=-1
-        place_j=-1
-        for p in range(0,12):
-            if (self.table[p//6][p%6]==i): place_i=p
-            if (self.table[p//6][p%6]==j): place_j=p
-        return (abs(place_i-place_j)==1     # Côte à côte
-             or abs(place_i-place_j)==6)    # Face à face
+        return self.position[self.noms.index(j)] in self.disposition.voisinage[self.position[self.noms.index(i)]]
+
+    # Fonction pour calculer la matrice d'adjacence entre invités
+    # Les lignes et colonnes de l'adjacence des places sont réordonnées selon le placement
+    # self: Etat courant
+    # Retourne une matrice booléenne n x n : True si les invités i et j sont voisins
+    def adjacence_invites(self) -> np.ndarray:
+        position = np.asarray(self.position)
+        return self.disposition.adjacence[np.ix_(position, position)]
+
+    # Fonction pour calculer, pour chaque invité, s'il est insatisfait
+    # Calcul vectorisé : une contrainte est violée si l'invité refuse un voisin
+    # qu'il a, ou veut un voisin qu'il n'a pas
+    # self: Etat courant
+    # Retourne un vecteur booléen de taille n
+    def insatisfaits(self) -> np.ndarray:
+        adjacence = self.adjacence_invites()
+        return ((self.refuse & adjacence) | (self.veut & ~adjacence)).any(axis=1)
 
     # Fonction pour calculer le nombre de personnes dont les demandes ne sont pas respectées
     # self: Etat courant
-    # Retourne entre 0 et 12 personnes insatisfaites
+    # Retourne entre 0 et n personnes insatisfaites
     def nb_insatisfaits(self) -> int:
-        insatisfaits = 0
-        for i in char_range('A','L'):
-            if (not self.satisfait(i)): 
-                insatisfaits=insatisfaits+1
-        return insatisfaits
+        return int(np.count_nonzero(self.insatisfaits()))
     
     # Fonction pour tester si une personne est satisfaite de sa place
     # self: Etat courant
     # i: Personne à vérifier
     # Retourne True si la personne voit ses demandes résolues
     def satisfait(self,i:str) -> bool:
-        for j in char_range('A','L'):
-            if (i==j): continue
-            if (self.contrainte(i,j)==-1 and self.voisins(i,j)):      return False    # Est à côté de quelqu'un qu'il n'aime pas
-            if (self.contrainte(i,j)==1 and not self.voisins(i,j)):   return False    # Veut un voisin et ne l'a pas
+        return self.invite_satisfait(self.noms.index(i))
+
+    # Fonction pour tester si un invité est satisfait, d'après son numéro
+    # Seules les contraintes exprimées par l'invité sont parcourues
+    # self: Etat courant
+    # g: Numéro de l'invité
+    # Retourne True si l'invité voit ses demandes résolues
+    def invite_satisfait(self,g:int) -> bool:
+        voisines = self.disposition.voisinage[self.position[g]]
+        for j, c in self.exigences[g]:
+            voisin = self.position[j] in voisines
+            if (c==-1 and voisin):      return False    # Est à côté de quelqu'un qu'il n'aime pas
+            if (c==1 and not voisin):   return False    # Veut un voisin et ne l'a pas
         return True
-    
+
+    # Fonction pour calculer la variation du nombre d'insatisfaits si l'on échange deux places
+    # Seuls les deux invités déplacés et ceux qui ont une contrainte à leur sujet peuvent changer
+    # d'avis : les autres ne sont pas réévalués. L'état est inchangé au retour.
+    # self: Etat courant
+    # i,j: Numéros de places à échanger
+    # Retourne le nombre d'insatisfaits après l'échange moins le nombre actuel
+    def delta_echange(self,i:int,j:int) -> int:
+        a, b = self.places[i], self.places[j]
+        touches = {a, b}
+        touches.update(self.concernes[a])
+        touches.update(self.concernes[b])
+
+        avant = sum(1 for g in touches if not self.invite_satisfait(g))
+        self.echanger(i,j)
+        apres = sum(1 for g in touches if not self.invite_satisfait(g))
+        self.echanger(i,j)
+        return apres - avant
+
+    # Fonction pour évaluer d'un seul coup tous les échanges de deux places
+    # Pour un échange des invités u et v, seuls changent d'avis u, v, et les invités k qui ont
+    # une contrainte au sujet de u ou de v. On note V[k,x] = 1 si la contrainte de k envers x
+    # est violée ; après l'échange, k voit u là où était v et inversement.
+    # * Pour u et v : leur nombre de contraintes violées après l'échange est un produit de
+    #   matrices (refus x adjacence + souhaits x non-adjacence), calculé pour tous les couples.
+    # * Pour chaque contrainte (k, x), on calcule pour tous les partenaires y l'état de k
+    #   après l'échange de x et y, puis on cumule les changements par couple (x, y).
+    # Le coût est proportionnel au nombre de contraintes fois le nombre d'invités ;
+    # les calculs sont découpés en blocs pour limiter la mémoire utilisée.
+    # self: Etat courant
+    # taille_bloc: Nombre maximal d'éléments des tableaux intermédiaires
+    # Retourne la matrice n x n des variations du nombre d'insatisfaits :
+    # élément (i, j) = effet de l'échange des places i et j (comme delta_echange)
+    def deltas_echanges(self, taille_bloc:int=1<<20) -> np.ndarray:
+        n = len(self.places)
+        adjacence = self.adjacence_invites().astype(np.int32)
+        refuse = self.refuse.astype(np.int32)
+        veut = self.veut.astype(np.int32)
+        non_adjacence = 1 - adjacence
+        np.fill_diagonal(non_adjacence, 0)
+
+        violees = refuse*adjacence + veut*non_adjacence
+        nb_violees = violees.sum(axis=1)
+        insatisfait = (nb_violees > 0).astype(np.int32)
+
+        # Invités déplacés : contraintes violées par u une fois à la place de v
+        # (produits en flottants : exacts pour ces petits entiers, et bien plus rapides)
+        produits = refuse.astype(float) @ adjacence.astype(float) + veut.astype(float) @ non_adjacence.astype(float)
+        nouvelles = produits.astype(np.int32) + violees
+        deplaces = (nouvelles > 0).astype(np.int32)
+
+        # Invités qui restent en place : changements cumulés par couple (x, y)
+        changements = np.zeros(n*n, dtype=np.int64)
+        exprimees = self.veut | self.refuse
+        ks, xs = self.paires_contraintes
+        autres = np.arange(n)
+        pas = max(1, taille_bloc // n)
+        for debut in range(0, len(ks), pas):
+            k, x = ks[debut:debut+pas], xs[debut:debut+pas]
+            a_kx = adjacence[k, x][:,None]
+            a_ky = adjacence[k]
+            apres = (nb_violees[k][:,None] - violees[k, x][:,None] - violees[k]
+                     + refuse[k, x][:,None]*a_ky + veut[k, x][:,None]*non_adjacence[k]
+                     + refuse[k]*a_kx + veut[k]*(1 - a_kx))
+            # Un couple (x, y) où k a une contrainte envers x et envers y n'est compté qu'une fois ;
+            # les couples où k lui-même est déplacé sont traités à part
+            garde = ~(exprimees[k] & (autres[None,:] < x[:,None]))
+            garde &= (autres[None,:] != k[:,None]) & (autres[None,:] != x[:,None])
+            variation = ((apres > 0).astype(np.int32) - insatisfait[k][:,None]) * garde
+            changements += np.bincount((x[:,None]*n + autres[None,:]).ravel(),
+                                       weights=variation.ravel(), minlength=n*n).astype(np.int64)
+        changements = changements.reshape(n, n)
+
+        deltas = (changements + changements.T + deplaces + deplaces.T
+                  - insatisfait[:,None] - insatisfait[None,:])
+        np.fill_diagonal(deltas, 0)
+        # Passage des couples d'invités aux couples de places
+        places = np.asarray(self.places)
+        return deltas[np.ix_(places, places)]
+
     # Fonction pour interpréter les contraintes d'après le tableau
     # self: Etat courant
     # i,j: Personnes à vérifier
     # 0,1 ou -1 selon l'encodage de la contrainte
     def contrainte(self,i:str,j:str)->int:
-        return self.contraintes[ord(i)-65][ord(j)-65]
+        return self.contraintes[self.noms.index(i), self.noms.index(j)]
 
     # Fonction pour échanger deux places
     # self: Etat à modifier
     # i,j: Numéros de places à échanger
     def echanger(self,i:int,j:int)->None:
-        tmp=self.table[i//6][i%6]
-        self.table[i//6][i%6]=self.table[j//6][j%6]
-        self.table[j//6][j%6]=tmp
+        a, b = self.places[i], self.places[j]
+        self.places[i], self.places[j] = b, a
+        self.position[a], self.position[b] = j, i
+
+    # Fonction pour imposer un placement
+    # self: Etat à modifier
+    # places: Numéro de l'invité assis à chaque place
+    def placer(self,places:list[int])->None:
+        self.places = list(places)
+        for p, g in enumerate(self.places):
+            self.position[g] = p
+
+    # Fonction pour placer les invités au hasard
+    # self: Etat à modifier
+    # graine: Graine du générateur aléatoire, pour un placement reproductible
+    def melanger(self,graine:int|None=None)->None:
+        self.placer(np.random.default_rng(graine).permutation(len(self.places)).tolist())
 
     # Fonction pour afficher l'état
     # self: Etat courant
     def __str__(self) -> str:
         res = "Plan de table:\n"
-        res += " "+ self.table[0][0] +" "+ self.table[0][1] +" "+ self.table[0][2] +" "+ self.table[0][3] +" "+ self.table[0][4] +" "+ self.table[0][5] +"\n"
-        res += "█████████████\n"
-        res += " "+ self.table[1][0] +" "+ self.table[1][1] +" "+ self.table[1][2] +" "+ self.table[1][3] +" "+ self.table[1][4] +" "+ self.table[1][5] +"\n"
+        for forme, rangees in self.disposition.tables:
+            lignes = [" " + " ".join(self.noms[self.places[p]] for p in rangee) for rangee in rangees]
+            if forme == 'rectangulaire':
+                res += lignes[0] + "\n" + "█"*(len(lignes[0])+1) + "\n" + lignes[1] + "\n"
+            else:
+                res += "(" + lignes[0] + " )\n"
 
-        nb_ins = self.nb_insatisfaits()
+        insatisfaits = self.insatisfaits()
+        nb_ins = int(np.count_nonzero(insatisfaits))
         res = res + "\nNombre d'insatisfaits : "+str(nb_ins)
 
         if (nb_ins>0):
-            res += " ("
-            for i in char_range('A','L'):
-                if (not self.satisfait(i)): res += i + ""
-            res += ")"
+            # Noms collés s'ils tiennent sur une lettre, séparés par des espaces sinon
+            separateur = "" if len(self.noms) <= 26 else " "
+            res += " (" + separateur.join(self.noms[g] for g in np.flatnonzero(insatisfaits)) + ")"
 
 
         return res
 
+############################################
+############# Instrumentation ##############
+############################################
+# Les recherches acceptent un objet Trace facultatif, qui compte le travail effectué :
+# échanges évalués, itérations, échanges améliorants et évolution du meilleur score.
+# Sans trace, elles ne paient qu'un test par itération.
+
+class Trace:
+    def __init__(self):
+        self.evaluations = 0        # Nombre d'échanges dont le delta a été calculé
+        self.iterations = 0         # Nombre d'étapes de la recherche
+        self.ameliorations = 0      # Nombre d'échanges appliqués qui ont réduit le score
+        self.historique = []        # Liste des (temps écoulé, meilleur score) à chaque record
+        self.temps = 0.0
+        self.debut = time.perf_counter()
+
+    # Fonction appelée au début d'une recherche, avec le score de l'état de départ
+    def demarrer(self, score:int):
+        self.debut = time.perf_counter()
+        self.historique.append((0.0, score))
+
+    # Fonction appelée à chaque itération
+    # evaluations: Nombre d'échanges évalués pendant l'itération
+    # delta: Variation du score due à l'échange appliqué (0 si aucun)
+    # meilleur: Meilleur score rencontré jusque-là
+    def etape(self, evaluations:int, delta:int, meilleur:int):
+        self.iterations += 1
+        self.evaluations += evaluations
+        if delta < 0:
+            self.ameliorations += 1
+        if meilleur < self.historique[-1][1]:
+            self.historique.append((time.perf_counter() - self.debut, meilleur))
+
+    # Fonction appelée à la fin d'une recherche
+    def terminer(self):
+        self.temps = time.perf_counter() - self.debut
+
+    # Retourne un résumé de la trace sous forme de dictionnaire (sérialisable en JSON)
+    def resume(self) -> dict:
+        return {
+            'evaluations': self.evaluations,
+            'iterations': self.iterations,
+            'ameliorations': self.ameliorations,
+            'temps': self.temps,
+            'evaluations_par_seconde': self.evaluations / self.temps if self.temps > 0 else None,
+            'temps_par_iteration': self.temps / self.iterations if self.iterations > 0 else None,
+            'historique': self.historique,
+        }
+
+    # Fonction pour enregistrer la trace dans un fichier JSON
+    def exporter(self, chemin:str):
+        with open(chemin, 'w') as fichier:
+            json.dump(self.resume(), fichier, indent=4)
+
+############################################
+############### Recherches #################
+############################################
+# Toutes les recherches ont la même signature :
+# etat: État de départ, modifié sur place (par défaut, la table de contraintes.csv)
+# budget: Temps maximal en secondes (None pour ne pas limiter)
+# graine: Graine du générateur aléatoire (ignorée par les recherches déterministes)
+# trace: Objet Trace à remplir pendant la recherche (facultatif)
+# Elles retournent le meilleur état rencontré.
+
 # Fonction pour faire la descente de gradient
-def descente_gradient():
-    etat = Etat()
-    nb_ins = etat.nb_insatisfaits()
-    meilleure_solution = etat
-    meilleur_nb_ins = nb_ins
-
-    while True:
-        amelioration = False
-        for i in range(12):
-            for j in range(i+1, 12):
-                nouvel_etat = meilleure_solution.copie_avec_echange(i, j)
-                nb_ins_nouveau = nouvel_etat.nb_insatisfaits()
-                if nb_ins_nouveau < meilleur_nb_ins:
-                    meilleur_nb_ins = nb_ins_nouveau
-                    amelioration = True
-                    meilleure_nouvelle_solution = nouvel_etat
-        if not amelioration:
+# À chaque étape, tous les échanges de deux places sont évalués d'un seul coup,
+# puis le meilleur est appliqué sur place (sans copier l'état)
+def descente_gradient(etat:Etat|None=None, budget:float|None=None, graine:int|None=None,
+                      trace:Trace|None=None) -> Etat:
+    if etat is None:
+        etat = Etat()
+    echeance = time.perf_counter() + budget if budget is not None else math.inf
+    n = len(etat.places)
+    if trace is not None:
+        score = etat.nb_insatisfaits()
+        trace.demarrer(score)
+
+    while time.perf_counter() < echeance:
+        deltas = etat.deltas_echanges()
+        i, j = np.unravel_index(np.argmin(deltas), deltas.shape)
+        delta = int(deltas[i, j])
+        if delta >= 0:
+            if trace is not None:
+                trace.etape(n*(n-1)//2, 0, score)
             break
+        etat.echanger(int(i), int(j))
+        if trace is not None:
+            score += delta
+            trace.etape(n*(n-1)//2, delta, score)
+
+    if trace is not None:
+        trace.terminer()
+    return etat
+
+# Fonction pour faire un recuit simulé
+# On tire un échange au hasard : il est accepté s'il n'augmente pas le nombre d'insatisfaits,
+# et sinon avec la probabilité exp(-delta/T). La température T décroît géométriquement de
+# temperature_initiale à temperature_finale au fil du budget (ou des itérations).
+# iterations: Nombre maximal d'échanges tirés (None pour s'arrêter au budget)
+def recuit_simule(etat:Etat|None=None, budget:float|None=1.0, graine:int|None=None,
+                  temperature_initiale:float=2.0, temperature_finale:float=0.05,
+                  iterations:int|None=None, trace:Trace|None=None) -> Etat:
+    if etat is None:
+        etat = Etat()
+    if budget is None and iterations is None:
+        raise ValueError("Le recuit simulé a besoin d'un budget ou d'un nombre d'itérations")
+    alea = random.Random(graine)
+    n = len(etat.places)
+    debut = time.perf_counter()
+
+    courant = etat.nb_insatisfaits()
+    meilleur, meilleures_places = courant, etat.places[:]
+    if trace is not None:
+        trace.demarrer(courant)
+    temperature = temperature_initiale
+    iteration = 0
+    while meilleur > 0:
+        # Avancement entre 0 et 1, mesuré en temps et/ou en itérations
+        if iteration % 100 == 0:
+            avancement = 0.0
+            if budget is not None:
+                avancement = (time.perf_counter() - debut) / budget if budget > 0 else 1.0
+            if iterations is not None:
+                avancement = max(avancement, iteration / iterations)
+            if avancement >= 1:
+                break
+            temperature = temperature_initiale * (temperature_finale/temperature_initiale) ** avancement
+        iteration += 1
+
+        i, j = alea.sample(range(n), 2)
+        delta = etat.delta_echange(i, j)
+        if delta <= 0 or alea.random() < math.exp(-delta/temperature):
+            etat.echanger(i, j)
+            courant += delta
+            if courant < meilleur:
+                meilleur, meilleures_places = courant, etat.places[:]
         else:
-            meilleure_solution = meilleure_nouvelle_solution
+            delta = 0
+        if trace is not None:
+            trace.etape(1, delta, meilleur)
+
+    etat.placer(meilleures_places)
+    if trace is not None:
+        trace.terminer()
+    return etat
 
-    print(meilleure_solution)
+# Fonction pour faire une recherche tabou
+# À chaque étape, on applique le meilleur échange, même s'il dégrade le plan, sauf ceux qui
+# déplacent un invité bougé lors des duree_tabou dernières étapes. Un échange tabou reste
+# permis s'il mène à un plan meilleur que tous ceux rencontrés (critère d'aspiration).
+# duree_tabou: Nombre d'étapes pendant lesquelles un invité déplacé ne peut plus bouger
+# iterations: Nombre maximal d'étapes (None pour s'arrêter au budget)
+def recherche_tabou(etat:Etat|None=None, budget:float|None=1.0, graine:int|None=None,
+                    duree_tabou:int|None=None, iterations:int|None=None, trace:Trace|None=None) -> Etat:
+    if etat is None:
+        etat = Etat()
+    if budget is None and iterations is None:
+        raise ValueError("La recherche tabou a besoin d'un budget ou d'un nombre d'itérations")
+    n = len(etat.places)
+    if duree_tabou is None:
+        duree_tabou = max(3, n // 10)
+    echeance = time.perf_counter() + budget if budget is not None else math.inf
+    # Bruit minime pour départager aléatoirement les échanges de même valeur
+    alea = np.random.default_rng(graine)
+
+    courant = etat.nb_insatisfaits()
+    meilleur, meilleures_places = courant, etat.places[:]
+    if trace is not None:
+        trace.demarrer(courant)
+    # tabou_jusqua[g] : première étape à laquelle l'invité g peut de nouveau être déplacé
+    tabou_jusqua = np.zeros(n, dtype=np.int64)
+    diagonale = np.eye(n, dtype=bool)
+    iteration = 0
+    while meilleur > 0 and time.perf_counter() < echeance and (iterations is None or iteration < iterations):
+        deltas = etat.deltas_echanges().astype(float) + alea.random((n, n)) * 0.1
+        tabou_place = tabou_jusqua[np.asarray(etat.places)] > iteration
+        interdits = (tabou_place[:,None] | tabou_place[None,:]) & (courant + deltas >= meilleur)
+        deltas[interdits | diagonale] = math.inf
+        i, j = np.unravel_index(np.argmin(deltas), deltas.shape)
+        if deltas[i, j] == math.inf:
+            # Tous les échanges sont tabous : on lève les interdictions
+            tabou_jusqua[:] = 0
+            continue
+
+        tabou_jusqua[etat.places[i]] = tabou_jusqua[etat.places[j]] = iteration + duree_tabou
+        etat.echanger(int(i), int(j))
+        delta = int(round(deltas[i, j]))
+        courant += delta
+        if courant < meilleur:
+            meilleur, meilleures_places = courant, etat.places[:]
+        iteration += 1
+        if trace is not None:
+            trace.etape(n*(n-1)//2, delta, meilleur)
+
+    etat.placer(meilleures_places)
+    if trace is not None:
+        trace.terminer()
+    return etat
+
+############################################
+############ Résolution exacte #############
+############################################
+# Séparation et évaluation : les places sont remplies une à une (dans l'ordre d'un parcours en
+# largeur des voisinages, pour que peu de places remplies aient encore des voisines libres).
+# Un invité est "condamné" dès qu'on est sûr qu'il sera insatisfait quelle que soit la suite :
+# * il est à côté de quelqu'un qu'il refuse, ou loin de quelqu'un qu'il veut et qui est placé ;
+# * ses voisines libres ne peuvent plus accueillir tous les invités qu'il veut encore, ou
+#   il ne reste plus assez d'invités qu'il accepte pour les remplir ;
+# * il n'est pas placé, et aucune place libre ne satisfait à la fois ces deux conditions et
+#   ses souhaits envers les invités déjà placés.
+# Le nombre de condamnés ne fait que croître. On y ajoute des insatisfaits certains parmi les
+# autres invités, en comptant des groupes disjoints :
+# * deux invités dont l'un veut l'autre qui le refuse : l'un des deux sera insatisfait ;
+# * un invité voulu par plus d'invités qu'il ne peut avoir de voisins : les autres le seront.
+# La somme est un minorant du coût final, et on abandonne une branche dès qu'elle atteint le
+# meilleur coût connu.
+# Deux réductions supplémentaires :
+# * symétries : l'invité 0 ne peut s'asseoir qu'à la plus petite place de son orbite ;
+# * mémoire : deux placements partiels avec les mêmes invités placés, les mêmes invités sur les
+#   places qui ont encore des voisines libres et les mêmes condamnés parmi ceux dont le sort
+#   n'est pas scellé ont exactement les mêmes suites possibles ; on ne garde que le moins coûteux.
+# Taille traitée : sur une table rectangulaire, avec des contraintes tirées par
+# contraintes_aleatoires (densités 0,05 à 0,2, graines 0 à 2), l'optimum est prouvé en moins
+# de 11 s jusqu'à 18 invités, et en moins de 40 s pour 11 des 12 instances de 20 invités
+# (la dernière, densité 0,15, en 90 s avec environ 200 Mo). Au-delà de 20 invités, ou pour des
+# contraintes plus denses, il faut s'attendre à ne pas obtenir de preuve : donner un budget.
+
+# Octets occupés par une entrée de dictionnaire, en plus de la clé et de la valeur (estimation)
+TAILLE_ENTREE_MEMOIRE = 100
+
+# Fonction pour trouver un plan optimal
+# contraintes, disposition: Description du problème (par défaut, celui de contraintes.csv)
+# budget: Temps maximal en secondes (None pour aller jusqu'à la preuve d'optimalité)
+# borne: Plan connu servant de point de départ (par défaut, le meilleur de quelques recherches tabou)
+# budget_borne: Temps consacré à ces recherches tabou, en secondes (au plus un dixième du budget)
+# octets_memoire: Taille maximale, en octets, des placements partiels mémorisés
+# graine: Graine des placements de départ des recherches tabou
+# Retourne le meilleur état trouvé et les statistiques de la recherche
+# (noeuds, élagages, placements reconnus en mémoire, temps, optimalité prouvée)
+def recherche_exacte(contraintes:np.ndarray|None=None, disposition:Disposition|None=None,
+                     budget:float|None=None, borne:Etat|None=None, budget_borne:float=1.0,
+                     octets_memoire:int=256 << 20, graine:int=0) -> tuple[Etat, dict]:
+    debut = time.perf_counter()
+    echeance = debut + budget if budget is not None else math.inf
+    etat = Etat(contraintes, disposition)
+    n = len(etat.places)
+    if borne is None:
+        # Quelques recherches tabou depuis des placements aléatoires : un bon plan de départ
+        # élague davantage, et reste le résultat si le budget est épuisé avant la preuve
+        if budget is not None:
+            budget_borne = min(budget_borne, budget / 10)
+        borne = descente_gradient(etat.copie())
+        for essai in range(4):
+            if borne.nb_insatisfaits() == 0:
+                break
+            depart = etat.copie()
+            depart.melanger(graine + essai)
+            candidat = recherche_tabou(depart, budget_borne / 4, graine + essai)
+            if candidat.nb_insatisfaits() < borne.nb_insatisfaits():
+                borne = candidat
+    meilleur, meilleures_places = borne.nb_insatisfaits(), borne.places[:]
+
+    voisinage = [sorted(v) for v in etat.disposition.voisinage]
+    voisinage_ens = etat.disposition.voisinage
+    exigences, concernes = etat.exigences, etat.concernes
+    representant = etat.disposition.representants()
+    # Couples (h, k) où h veut k qui le refuse, et invités qui veulent chaque invité
+    paires_conflit = [(h, k) for h in range(n) for k, c in exigences[h] if c == 1 and (h, -1) in exigences[k]]
+    voulu_par = [[h for h in concernes[x] if (x, 1) in exigences[h]] for x in range(n)]
+    degre_max = max(len(v) for v in voisinage)
+
+    # Ordre de remplissage des places : parcours en largeur, table par table
+    ordre, vues = [], [False]*n
+    for p0 in range(n):
+        if vues[p0]: continue
+        vues[p0] = True
+        file = [p0]
+        for p in file:
+            ordre.append(p)
+            for q in voisinage[p]:
+                if not vues[q]:
+                    vues[q] = True
+                    file.append(q)
+
+    position = [-1]*n           # Place de chaque invité (-1 s'il n'est pas placé)
+    occupant = [-1]*n           # Invité assis à chaque place (-1 si elle est libre)
+    libres = [len(v) for v in voisinage]    # Nombre de voisines libres de chaque place
+    condamne = [False]*n
+    restants = n                # Nombre d'invités non placés (les places libres sont ordre[n-restants:])
+    stats = {'noeuds': 0, 'elagages': 0, 'memoire': 0}
+    memoire = {}
+    octets = 0                  # Taille estimée de la mémoire
+    interrompu = False
+
+    # L'invité h est-il forcément insatisfait, quelle que soit la suite du placement ?
+    # Les places libres seront occupées par les invités non placés : pour que h soit satisfait,
+    # il faut une place (la sienne, ou une place libre voisine d'un invité voulu déjà placé)
+    # dont les voisines déjà occupées lui conviennent, et dont les voisines libres peuvent
+    # accueillir tous les invités qu'il veut encore, sans qu'il faille y asseoir un invité refusé.
+    # Un invité non placé qui ne veut aucun invité déjà placé n'est jamais condamné.
+    def est_condamne(h):
+        p = position[h]
+        voulus_places, refuses_places = [], []
+        voulus_libres = refuses_libres = 0
+        for x, c in exigences[h]:
+            if position[x] < 0:
+                if c == 1: voulus_libres += 1
+                else:      refuses_libres += 1
+            elif c == 1:
+                voulus_places.append(position[x])
+            else:
+                refuses_places.append(position[x])
+        if p >= 0:
+            voisines = voisinage_ens[p]
+            if any(q not in voisines for q in voulus_places) or any(q in voisines for q in refuses_places):
+                return True
+            return voulus_libres > libres[p] or restants - refuses_libres < libres[p]
+        if not voulus_places:
+            return False
+        for s in voisinage[voulus_places[0]]:
+            if occupant[s] >= 0 or libres[s] < voulus_libres or restants-1 - refuses_libres < libres[s]:
+                continue
+            voisines = voisinage_ens[s]
+            if all(q in voisines for q in voulus_places) and not any(q in voisines for q in refuses_places):
+                return False
+        return True
+
+    # Nombre minimal d'insatisfaits parmi les invités qui ne sont pas encore condamnés
+    def supplement():
+        marque = condamne[:]
+        extra = 0
+        for h, k in paires_conflit:
+            if not marque[h] and not marque[k]:
+                marque[h] = marque[k] = True
+                extra += 1
+        for x in range(n):
+            w = [h for h in voulu_par[x] if not marque[h]]
+            p = position[x]
+            if p >= 0:
+                cap = libres[p] + sum(1 for h in w if position[h] in voisinage_ens[p])
+            else:
+                cap = degre_max
+            if len(w) > cap:
+                extra += len(w) - cap
+                for h in w: marque[h] = True
+        return extra
+
+    def explorer(profondeur, nb_condamnes, invites_places, representants_libres):
+        nonlocal meilleur, meilleures_places, interrompu, restants, octets
+        stats['noeuds'] += 1
+        if profondeur == n:
+            if nb_condamnes < meilleur:
+                meilleur, meilleures_places = nb_condamnes, occupant[:]
+            return
+        if time.perf_counter() > echeance:
+            interrompu = True
+            return
+
+        # Placements partiels équivalents déjà rencontrés à moindre coût
+        frontiere = [occupant[p]+1 if libres[p] > 0 else 0 for p in ordre[:profondeur]]
+        frontiere = bytes(frontiere) if n < 256 else tuple(frontiere)
+        ouverts = 0
+        scelles = 0
+        for h in range(n):
+            if condamne[h]:
+                if position[h] < 0 or libres[position[h]] > 0:
+                    ouverts |= 1 << h
+                else:
+                    scelles += 1
+        cle = (invites_places, frontiere, ouverts)
+        if cle in memoire and memoire[cle] <= scelles:
+            stats['memoire'] += 1
+            return
+        if octets < octets_memoire:
+            memoire[cle] = scelles
+            octets += (sys.getsizeof(cle) + sys.getsizeof(invites_places) + sys.getsizeof(frontiere)
+                       + sys.getsizeof(ouverts) + TAILLE_ENTREE_MEMOIRE)
+
+        s = ordre[profondeur]
+        for g in range(n):
+            if position[g] >= 0:
+                continue
+            if g == 0 and representant[s] != s:
+                continue
+            # L'invité 0 doit encore pouvoir s'asseoir sur une place représentante
+            if g != 0 and position[0] < 0 and representants_libres - (representant[s] == s) == 0:
+                continue
+
+            position[g], occupant[s] = s, g
+            restants -= 1
+            for q in voisinage[s]:
+                libres[q] -= 1
+            touches = {g}
+            touches.update(concernes[g])
+            for q in voisinage[s]:
+                if occupant[q] >= 0:
+                    touches.add(occupant[q])
+                    touches.update(concernes[occupant[q]])
+            nouveaux = [h for h in touches if not condamne[h] and est_condamne(h)]
+            for h in nouveaux:
+                condamne[h] = True
+
+            if nb_condamnes + len(nouveaux) < meilleur and \
+               nb_condamnes + len(nouveaux) + supplement() < meilleur:
+                explorer(profondeur+1, nb_condamnes + len(nouveaux), invites_places | (1 << g),
+                         representants_libres - (representant[s] == s))
+            else:
+                stats['elagages'] += 1
+
+            for h in nouveaux:
+                condamne[h] = False
+            for q in voisinage[s]:
+                libres[q] += 1
+            restants += 1
+            position[g], occupant[s] = -1, -1
+            if interrompu:
+                return
+
+    nb_representants = sum(1 for p in range(n) if representant[p] == p)
+    explorer(0, 0, 0, nb_representants)
+
+    etat.placer(meilleures_places)
+    stats['temps'] = time.perf_counter() - debut
+    stats['optimal'] = not interrompu
+    return etat, stats
+
+# Recherches disponibles, sélectionnables en ligne de commande
+MODES = {
+    'descente': descente_gradient,
+    'recuit': recuit_simule,
+    'tabou': recherche_tabou,
+}
+
+# Fonction exécutée par chaque processus lors des redémarrages aléatoires
+# Enchaîne des recherches depuis des placements aléatoires jusqu'à épuisement des graines
+# ou dépassement de l'échéance ; le premier essai est toujours mené, même échéance dépassée,
+# pour que chaque processus rende un placement
+# mode: Nom de la recherche (voir MODES)
+# graines: Graines des placements de départ à essayer
+# budget_essai: Budget de chaque recherche, en secondes
+# echeance: Heure (time.time) à laquelle il faut rendre la main
+# contraintes, disposition: Description du problème
+# Retourne le meilleur résultat sous la forme (nombre d'insatisfaits, places, nombre d'essais)
+def _essais(mode:str, graines:list[int], budget_essai:float, echeance:float,
+            contraintes:np.ndarray|None, disposition:Disposition|None) -> tuple[int, list[int], int]:
+    depart = Etat(contraintes, disposition)
+    meilleur, meilleures_places, nb_essais = None, None, 0
+    for graine in graines:
+        restant = max(echeance - time.time(), 0.0)
+        if restant <= 0 and nb_essais > 0:
+            break
+        etat = depart.copie()
+        etat.melanger(graine)
+        MODES[mode](etat, min(budget_essai, restant), graine)
+        nb_essais += 1
+        nb_ins = etat.nb_insatisfaits()
+        if meilleur is None or nb_ins < meilleur:
+            meilleur, meilleures_places = nb_ins, etat.places[:]
+            if meilleur == 0:
+                break
+    return meilleur, meilleures_places, nb_essais
+
+# Fonction pour lancer des recherches indépendantes en parallèle et garder le meilleur plan
+# Chaque essai part d'un placement aléatoire tiré avec sa propre graine : les résultats sont
+# reproductibles à budget suffisant.
+# mode: Nom de la recherche (voir MODES)
+# essais: Nombre total de recherches (par défaut, une par processus)
+# processus: Nombre de processus (par défaut, un par cœur)
+# budget: Temps maximal total, en secondes ; il est partagé entre les essais d'un même processus
+# graine: Graine du premier essai, les suivants utilisent les graines suivantes
+# contraintes, disposition: Description du problème (par défaut, celui de contraintes.csv)
+# Retourne le meilleur état trouvé
+def redemarrages(mode:str='descente', essais:int|None=None, processus:int|None=None,
+                 budget:float=10.0, graine:int=0, contraintes:np.ndarray|None=None,
+                 disposition:Disposition|None=None) -> Etat:
+    if processus is None:
+        processus = os.cpu_count() or 1
+    if essais is None:
+        essais = processus
+    processus = min(processus, essais)
+    budget_essai = budget * processus / essais
+    echeance = time.time() + budget
+
+    resultats = []
+    with ProcessPoolExecutor(max_workers=processus) as executor:
+        futures = [executor.submit(_essais, mode, list(range(graine + w, graine + essais, processus)),
+                                   budget_essai, echeance, contraintes, disposition)
+                   for w in range(processus)]
+        resultats = [f.result() for f in futures]
+
+    meilleur = min((r for r in resultats if r[0] is not None), key=lambda r: r[0])
+    etat = Etat(contraintes, disposition)
+    etat.placer(meilleur[1])
+    return etat
 
 #########################################
 ########### Exécution du code ###########
 #########################################
-descente_gradient()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recherche d'un plan de table.")
+    parser.add_argument('--mode', choices=sorted(MODES), default='descente',
+                        help="algorithme de recherche")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="temps maximal en secondes")
+    parser.add_argument('--essais', type=int, default=None,
+                        help="nombre de redémarrages aléatoires (par défaut, aucun : départ de l'ordre alphabétique)")
+    parser.add_argument('--processus', type=int, default=None,
+                        help="nombre de processus pour les redémarrages (par défaut, un par cœur)")
+    parser.add_argument('--graine', type=int, default=0,
+                        help="graine du générateur aléatoire")
+    parser.add_argument('--trace', metavar='FICHIER', default=None,
+                        help="fichier JSON où enregistrer l'instrumentation de la recherche (sans redémarrages)")
+    parser.add_argument('--exact', action='store_true',
+                        help="recherche d'un plan optimal, comparée aux recherches locales")
+    parser.add_argument('--tailles', nargs='*', type=int, default=[14, 16, 18, 20],
+                        help="nombres d'invités (pairs) des instances aléatoires ajoutées à contraintes.csv pour --exact")
+    parser.add_argument('--densite', type=float, default=0.1,
+                        help="proportion de paires d'invités avec une contrainte dans ces instances")
+    args = parser.parse_args()
+
+    if args.exact:
+        instances = [("contraintes.csv", None)]
+        instances += [("{0} invités, densité {1}".format(n, args.densite),
+                       contraintes_aleatoires(n, args.densite, args.graine)) for n in args.tailles]
+        for titre, contraintes in instances:
+            print(titre)
+            etat, stats = recherche_exacte(contraintes, budget=args.budget, graine=args.graine)
+            print(etat)
+            print("{0} : {1} noeuds, {2} élagages, {3} placements déjà vus, {4:.3f} s".format(
+                "Optimum prouvé" if stats['optimal'] else "Budget épuisé",
+                stats['noeuds'], stats['elagages'], stats['memoire'], stats['temps']))
+            depart = Etat(contraintes)
+            if contraintes is not None:
+                depart.melanger(args.graine)
+            for mode, recherche in sorted(MODES.items()):
+                debut = time.perf_counter()
+                resultat = recherche(depart.copie(), 1.0 if mode != 'descente' else None, args.graine)
+                print("{0:<10} {1} insatisfaits en {2:.3f} s".format(
+                    mode, resultat.nb_insatisfaits(), time.perf_counter() - debut))
+            print()
+    elif args.essais is None:
+        budget = args.budget if args.budget is not None or args.mode == 'descente' else 1.0
+        trace = Trace() if args.trace is not None else None
+        print(MODES[args.mode](Etat(), budget, args.graine, trace=trace))
+        if trace is not None:
+            trace.exporter(args.trace)
+    else:
+        print(redemarrages(args.mode, args.essais, args.processus,
+                           args.budget if args.budget is not None else 10.0, args.graine))